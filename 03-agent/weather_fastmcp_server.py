@@ -1,9 +1,77 @@
 from fastmcp import FastMCP
+import os
+import sys
+import time
 import random
+import sqlite3
+import threading
+
+# Seconds a generated (random) temperature is reused for the same city
+GENERATED_TTL = float(os.getenv("WEATHER_GENERATED_TTL", "300"))
+# Optional SQLite file to persist temperatures set through set_weather
+WEATHER_DB = os.getenv("WEATHER_DB")
+
+
+class WeatherStore:
+    """
+    Thread-safe temperature store. Tools may run concurrently (FastMCP runs sync
+    tools in worker threads), so every read/write goes through one lock.
+    Known values are optionally persisted to SQLite; generated values are cached
+    in memory for GENERATED_TTL seconds so repeated lookups agree.
+    """
+
+    def __init__(self, initial=None, db_path=None, generated_ttl=GENERATED_TTL):
+        self._lock = threading.Lock()
+        self._known = initial if initial is not None else {}
+        self._generated = {}
+        self._ttl = generated_ttl
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS weather (city TEXT PRIMARY KEY, temp REAL)")
+            self._db.commit()
+            self._known.update(dict(self._db.execute("SELECT city, temp FROM weather")))
+
+    @staticmethod
+    def normalize(city: str) -> str:
+        return city.strip().lower()
+
+    def _get_locked(self, city: str, now: float) -> float:
+        if city in self._known:
+            return self._known[city]
+        cached = self._generated.get(city)
+        if cached and now - cached[1] < self._ttl:
+            return cached[0]
+        temp = round(random.uniform(-5, 35), 1)
+        self._generated[city] = (temp, now)
+        return temp
+
+    def get_many(self, cities) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {c: self._get_locked(c, now) for c in map(self.normalize, cities)}
+
+    def set_many(self, temps: dict) -> None:
+        rows = [(self.normalize(c), float(t)) for c, t in temps.items()]
+        with self._lock:
+            for city, temp in rows:
+                self._known[city] = temp
+                self._generated.pop(city, None)
+            if self._db is not None:
+                self._db.executemany("INSERT OR REPLACE INTO weather (city, temp) VALUES (?, ?)", rows)
+                self._db.commit()
+
+    def get(self, city: str) -> float:
+        return self.get_many([city])[self.normalize(city)]
+
+    def set(self, city: str, temp: float) -> None:
+        self.set_many({city: temp})
+
 
 known_weather_data = {
     'berlin': 20.0
 }
+store = WeatherStore(known_weather_data, db_path=WEATHER_DB)
 
 mcp = FastMCP("Demo 🚀")
 
@@ -18,12 +86,20 @@ def get_weather(city: str) -> float:
     Returns:
         float: The temperature associated with the city.
     """
-    city = city.strip().lower()
+    return store.get(city)
 
-    if city in known_weather_data:
-        return known_weather_data[city]
+@mcp.tool
+def get_weather_many(cities: list[str]) -> dict[str, float]:
+    """
+    Retrieves the temperature for several cities in one call.
 
-    return round(random.uniform(-5, 35), 1)
+    Parameters:
+        cities (list[str]): The names of the cities.
+
+    Returns:
+        dict[str, float]: Temperature per (normalized) city name.
+    """
+    return store.get_many(cities)
 
 @mcp.tool
 def set_weather(city: str, temp: float) -> None:
@@ -37,9 +113,28 @@ def set_weather(city: str, temp: float) -> None:
     Returns:
         str: A confirmation string 'OK' indicating successful update.
     """
-    city = city.strip().lower()
-    known_weather_data[city] = temp
+    store.set(city, temp)
+    return 'OK'
+
+@mcp.tool
+def set_weather_many(temps: dict[str, float]) -> str:
+    """
+    Sets the temperature for several cities in one call.
+
+    Parameters:
+        temps (dict[str, float]): Temperature per city name.
+
+    Returns:
+        str: A confirmation string 'OK' indicating successful update.
+    """
+    store.set_many(temps)
     return 'OK'
 
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    # python weather_fastmcp_server.py            -> stdio
+    # python weather_fastmcp_server.py http 8000  -> streamable HTTP on /mcp
+    if len(sys.argv) > 1 and sys.argv[1] == "http":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+        mcp.run(transport="http", host="127.0.0.1", port=port)
+    else:
+        mcp.run()
@@ -1,10 +1,101 @@
 from fastmcp import Client
+import os
+import sys
+import time
 import asyncio
+import argparse
+import statistics
+
+# resolved from this file, so the client works from any working directory
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weather_fastmcp_server.py")
+CONNECT_TIMEOUT_S = 60
+CITIES = ["berlin", "paris", "london", "madrid", "rome", "cairo", "riyadh", "tokyo"]
+
 
 async def main():
-    async with Client("weather_fastmcp_server.py") as mcp_client:
+    async with Client(SERVER_SCRIPT) as mcp_client:
         result = await mcp_client.list_tools()
         print(result)
 
+
+# ---------- Load test ----------
+async def run_session(target, calls: int, batch: bool, latencies: list, connected: asyncio.Queue, go: asyncio.Event):
+    """One client session issuing `calls` tool calls back to back."""
+    async with Client(target) as client:
+        # connection/process start-up is not part of the measurement
+        await connected.put(1)
+        await go.wait()
+        for i in range(calls):
+            start = time.perf_counter()
+            if batch:
+                await client.call_tool("get_weather_many", {"cities": CITIES})
+            else:
+                await client.call_tool("get_weather", {"city": CITIES[i % len(CITIES)]})
+            latencies.append(time.perf_counter() - start)
+
+
+async def cancel(tasks):
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def load_test(target, sessions: int, calls: int, batch: bool, connect_timeout: float = CONNECT_TIMEOUT_S) -> dict:
+    """Run `sessions` concurrent sessions and report tool-call latency/throughput.
+    The first session error (or a connect timeout) cancels the others and is raised."""
+    latencies = []
+    connected, go = asyncio.Queue(), asyncio.Event()
+    tasks = [asyncio.create_task(run_session(target, calls, batch, latencies, connected, go)) for _ in range(sessions)]
+
+    async def all_connected():
+        for _ in range(sessions):
+            await connected.get()
+
+    # a session that ends before `go` is set has failed (server did not start, connection refused...)
+    ready = asyncio.create_task(all_connected())
+    done, _ = await asyncio.wait([ready, *tasks], timeout=connect_timeout, return_when=asyncio.FIRST_COMPLETED)
+    if ready not in done:
+        await cancel([ready, *tasks])
+        for t in done:
+            t.result()  # re-raises the session's error
+        raise TimeoutError(f"{sessions} sessions not connected after {connect_timeout} s")
+
+    start = time.perf_counter()
+    go.set()
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    await cancel(pending)
+    for t in done:
+        t.result()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    ms = [l * 1000 for l in latencies]
+    return {
+        "sessions": sessions,
+        "calls": len(ms),
+        "cities_per_call": len(CITIES) if batch else 1,
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_s": round(len(ms) / elapsed, 1),
+        "cities_per_s": round(len(ms) * (len(CITIES) if batch else 1) / elapsed, 1),
+        "p50_ms": round(statistics.median(ms), 2),
+        "p95_ms": round(ms[int(0.95 * (len(ms) - 1))], 2),
+        "max_ms": round(ms[-1], 2),
+    }
+
+
 if __name__ == "__main__":
-    test = asyncio.run(main())
\ No newline at end of file
+    if len(sys.argv) == 1:
+        test = asyncio.run(main())
+    else:
+        # e.g. python weather_mcp_client.py --sessions 16 --calls 50
+        #      python weather_mcp_client.py --transport http --url http://127.0.0.1:8000/mcp --batch
+        parser = argparse.ArgumentParser(description="Load-test the weather MCP server.")
+        parser.add_argument("--transport", choices=["stdio", "http"], default="stdio")
+        parser.add_argument("--url", default="http://127.0.0.1:8000/mcp", help="server URL for --transport http")
+        parser.add_argument("--sessions", type=int, default=8, help="concurrent client sessions")
+        parser.add_argument("--calls", type=int, default=20, help="tool calls per session")
+        parser.add_argument("--batch", action="store_true", help="use get_weather_many instead of get_weather")
+        parser.add_argument("--connect-timeout", type=float, default=CONNECT_TIMEOUT_S, help="seconds for every session to connect")
+        args = parser.parse_args()
+        # stdio starts one server process per session; http shares one server
+        target = SERVER_SCRIPT if args.transport == "stdio" else args.url
+        print({"transport": args.transport, **asyncio.run(load_test(target, args.sessions, args.calls, args.batch, args.connect_timeout))})
@@ -0,0 +1,123 @@
+import argparse
+import contextlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import pandas as pd
+
+import search_process as sp
+from search_process import prepare_search, retrieve_hybrid_rerank, retrieve_cascade, RETRIEVAL_CONFIG
+from evaluation import GROUND_TRUTH_PATH, evaluate_mode
+from rag_engine.tuning import LATENCY_COLUMNS, configurations, pareto_front, choose, save_params
+
+# Sweep the retrieval knobs over the ground-truth set, report the
+# quality / latency Pareto frontier and write the chosen configuration to
+# RETRIEVAL_CONFIG (loaded by search_process at import).
+#
+#   python autotune.py --limit 150 --max-latency-ms 120
+#
+# FINAL_TOP_N is not swept: hit rate and MRR are measured @FINAL_TOP_N, so
+# configurations returning 3 or 5 results would not be compared on the same k.
+# Neither is RERANK_TOP_N: the cross-encoder scores every candidate either way
+# and only the FINAL_TOP_N best are returned, so it changes neither quality
+# nor latency; the candidate counts decide both.
+
+GRID = {
+    "VEC_TOP_K": [6, 12, 20],
+    "BM25_TOP_K": [6, 12, 20],
+}
+
+
+@contextlib.contextmanager
+def knobs(params: Dict[str, int]):
+    """Temporarily set search_process knobs (they are read at call time)."""
+    old = {k: getattr(sp, k) for k in params}
+    for k, v in params.items():
+        setattr(sp, k, v)
+    try:
+        yield
+    finally:
+        for k, v in old.items():
+            setattr(sp, k, v)
+
+
+def evaluate_config(params: Dict[str, int], df: pd.DataFrame, prepare_dict: Dict) -> Dict:
+    """Quality and end-to-end latency of one configuration, on the pipeline the runtime uses
+    (cascade when SEARCH_CASCADE=true). The result cache is bypassed."""
+    index, bm25, corpus = prepare_dict["index"], prepare_dict["bm25"], prepare_dict["corpus_items"]
+    if sp.CASCADE_ENABLED:
+        retrieve = lambda q, trace: retrieve_cascade(index, bm25, corpus, q, trace=trace)
+    else:
+        retrieve = lambda q, trace: retrieve_hybrid_rerank(index, bm25, corpus, q)
+    with knobs(params):
+        sp.embed_query.cache_clear()  # every configuration pays for its own query embeddings
+        out = evaluate_mode(df, retrieve)
+    return {
+        **params,
+        "hit_rate": out["hit"].mean(),  # @FINAL_TOP_N, the same for every configuration
+        "mrr": out["mrr"].mean(),
+        "avg_latency_ms": out["latency_ms"].mean(),
+        "p95_latency_ms": out["latency_ms"].quantile(0.95),
+    }
+
+
+def autotune(csv_path: str = GROUND_TRUTH_PATH, grid: Dict[str, List[int]] = GRID, limit: Optional[int] = 150,
+             seed: int = 42, prepare_dict: Dict = None) -> pd.DataFrame:
+    """One row per configuration: knobs, hit_rate, mrr, avg/p95 latency."""
+    prepare_dict = prepare_dict or prepare_search()
+    df = pd.read_csv(csv_path)
+    if limit and limit < len(df):
+        df = df.sample(n=limit, random_state=seed)  # questions are grouped by document; sample across all
+
+    # load the embedding model and cross-encoder before anything is timed
+    retrieve_hybrid_rerank(prepare_dict["index"], prepare_dict["bm25"], prepare_dict["corpus_items"], str(df.iloc[0]["question"]))
+
+    configs = configurations(grid)
+    rows = []
+    for n, params in enumerate(configs, 1):
+        rows.append(evaluate_config(params, df, prepare_dict))
+        print(f"[{n}/{len(configs)}] {params} mrr={rows[-1]['mrr']:.3f} p95={rows[-1]['p95_latency_ms']:.1f} ms")
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the retrieval knobs on the ground-truth set.")
+    parser.add_argument("--csv", default=GROUND_TRUTH_PATH)
+    parser.add_argument("--limit", type=int, default=150, help="questions sampled from the ground truth (0 = all)")
+    parser.add_argument("--seed", type=int, default=42)
+    for knob, values in GRID.items():
+        parser.add_argument("--" + knob.lower().replace("_", "-"), dest=knob, type=int, nargs="+", default=values)
+    parser.add_argument("--objective", choices=["mrr", "hit_rate"], default="mrr")
+    parser.add_argument("--latency", choices=LATENCY_COLUMNS, default="p95_latency_ms")
+    parser.add_argument("--max-latency-ms", type=float, default=None, help="latency budget for the chosen configuration")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="quality given up for a faster configuration")
+    parser.add_argument("--output", default=RETRIEVAL_CONFIG)
+    parser.add_argument("--report", default=None, help="also write every configuration to this CSV")
+    parser.add_argument("--dry-run", action="store_true", help="report only, do not write the config")
+    args = parser.parse_args()
+
+    results = autotune(args.csv, {k: getattr(args, k) for k in GRID}, args.limit, args.seed)
+    if args.report:
+        results.to_csv(args.report, index=False)
+    front = pareto_front(results, args.objective, args.latency)
+    chosen = choose(front, args.objective, args.latency, args.max_latency_ms, args.tolerance)
+
+    print("\nAll configurations:")
+    print(results.sort_values(args.objective, ascending=False).to_string(index=False))
+    print(f"\nPareto frontier ({args.objective} vs {args.latency}):")
+    print(front.to_string(index=False))
+    params = {k: int(chosen[k]) for k in GRID}
+    print(f"\nChosen: {params}  {args.objective}={chosen[args.objective]:.3f}  {args.latency}={chosen[args.latency]:.1f}")
+
+    if not args.dry_run:
+        save_params(
+            params,
+            args.output,
+            metrics={m: float(chosen[m]) for m in ("hit_rate", "mrr", *LATENCY_COLUMNS)},
+            objective=args.objective,
+            latency=args.latency,
+            max_latency_ms=args.max_latency_ms,
+            ground_truth=args.csv,
+            queries=args.limit or None,
+            tuned_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        print(f"✅ wrote {args.output}")
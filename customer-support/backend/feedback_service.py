@@ -30,3 +30,29 @@ def load_feedback_df():
     df = pd.read_sql_query("SELECT * FROM feedback ORDER BY timestamp DESC", conn)
     conn.close()
     return df
+
+
+def top_queries(limit=50):
+    """Most frequently asked questions in the feedback table (used to pre-warm the result cache)."""
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'feedback'")
+        columns = {row[0] for row in cur.fetchall()}
+        # save_feedback() stores the question as `query`, init_db() as `question`
+        column = next((c for c in ("query", "question") if c in columns), None)
+        if column is None:
+            return []
+        cur.execute(f"""
+            SELECT MIN({column}) AS q, COUNT(*) AS n
+            FROM feedback
+            WHERE {column} IS NOT NULL AND TRIM({column}) <> ''
+            GROUP BY LOWER(TRIM({column}))
+            ORDER BY n DESC
+            LIMIT %s
+        """, (limit,))
+        rows = cur.fetchall()
+        cur.close()
+        return [q for q, _ in rows]
+    finally:
+        conn.close()
@@ -1,11 +1,24 @@
-from data_ingestion import connect_to_index
-from search_process import prepare_search , query_without_llm, query_with_llm
+import threading
+from functools import lru_cache
+from search_process import prepare_search , query_without_llm, query_with_llm , cached_answer , warm_cache
+from rag_engine.profiling import profile_request
 
+@lru_cache(maxsize=1)
 def connect_to_qdrant():
-    return prepare_search() 
+    # Streamlit re-runs the page script on every interaction; the index and
+    # corpus are built once per process and shared by all sessions
+    prepared = prepare_search()
+    # pre-warm the result cache in the background so the first page is not delayed
+    threading.Thread(target=warm_cache, args=(prepared,), daemon=True, name="cache-warmup").start()
+    return prepared
 
-def retrieve_answers(query: str,prepared_dict):
-    return query_without_llm(prepared_dict['index'],prepared_dict['bm25'],prepared_dict['corpus_items'], query)
+def retrieve_answers(query: str,prepared_dict, debug: bool = False):
+    return query_without_llm(prepared_dict['index'],prepared_dict['bm25'],prepared_dict['corpus_items'], query, debug=debug)
 
-def generate_final_answer(query: str, results):
-    return query_with_llm(query, results)
+def generate_final_answer(query: str, results, debug: bool = False, prepared_dict=None):
+    with profile_request(query, "answer", debug):
+        if prepared_dict is None:
+            return query_with_llm(query, results)
+        # cached next to the search results and invalidated with them
+        return cached_answer(prepared_dict['index'], prepared_dict['corpus_items'], query,
+                             lambda: query_with_llm(query, results), debug=debug)
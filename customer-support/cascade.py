@@ -0,0 +1,66 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+# Cascade rules (see search_process.retrieve_cascade): pure functions over
+# ranked (key, score) lists, with the thresholds passed in by the caller, so
+# they can be tested and tuned without the models or Qdrant.
+
+Key = Union[int, str]
+Scored = List[Tuple[Key, float]]
+
+CASCADE_MIN_DEPTH = 3
+RRF_K = 60
+
+
+def margin(scored: Scored, relative: bool = False) -> float:
+    """Gap between the top-1 and top-2 scores (relative to top-1 if asked)."""
+    if not scored:
+        return 0.0
+    top1 = scored[0][1]
+    top2 = scored[1][1] if len(scored) > 1 else 0.0
+    gap = top1 - top2
+    if relative:
+        return gap / top1 if top1 > 0 else 0.0
+    return gap
+
+def adaptive_depth(scored: Scored, window: Optional[float] = None, floor: Optional[float] = None,
+                   min_depth: int = CASCADE_MIN_DEPTH) -> Scored:
+    """
+    Cut a ranked list where scores fall off: keep hits within `window` of the best
+    (absolute) or above `floor` * best (relative). Flat score lists keep more
+    candidates, peaked ones fewer; never less than `min_depth`.
+    """
+    if not scored:
+        return scored
+    best = scored[0][1]
+    keep = len(scored)
+    for i, (_, sc) in enumerate(scored):
+        if (window is not None and sc < best - window) or (floor is not None and sc < best * floor):
+            keep = i
+            break
+    return scored[:max(keep, min_depth)]
+
+def rrf_merge(*ranked_lists: Scored, k: int = RRF_K) -> Scored:
+    fused: Dict[Key, float] = {}
+    for ranked in ranked_lists:
+        for rank, (did, _) in enumerate(ranked):
+            fused[did] = fused.get(did, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda x: x[1], reverse=True)
+
+def cascade_exit(v_scored: Scored, b_scored: Scored, dense_margin_min: float, bm25_margin_min: float,
+                 dense_only_margin: float) -> Optional[str]:
+    """
+    Name of the early-exit rule that fires, or None to rerank:
+      "dense_margin": the dense top-1 leads by dense_only_margin on its own (<= 0 disables)
+      "agreement":    dense and BM25 share the top-1, each with a clear margin
+                      (absolute for dense, relative to top-1 for BM25)
+    """
+    if not v_scored:
+        return None
+    dense_margin = margin(v_scored)
+    if dense_only_margin > 0 and dense_margin >= dense_only_margin:
+        return "dense_margin"
+    if (b_scored and v_scored[0][0] == b_scored[0][0]
+            and dense_margin >= dense_margin_min
+            and margin(b_scored, relative=True) >= bm25_margin_min):
+        return "agreement"
+    return None
@@ -0,0 +1,129 @@
+import os
+import sys
+import shutil
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+
+# TextColumn / BM25Columns are shared with the HR assistant (repo-level rag_engine package)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from rag_engine.columns import TextColumn, BM25Columns
+
+# Columnar, read-only FAQ corpus.
+# Texts live in one UTF-8 buffer + offsets, doc ids in a NumPy unicode array and
+# BM25 as term postings arrays (rag_engine/columns.py), so the whole corpus is a
+# handful of arrays instead of one Python object (and dict) per document.
+# Everything is addressed by integer position; rows are only materialized for
+# the final results.
+# A saved store is memory-mapped, so processes loading it share the pages.
+
+CORPUS_STORE_DIR = os.getenv("CORPUS_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "corpus_store"))
+
+
+class CorpusRow:
+    """View of one document; reads from the store's columns on access."""
+    __slots__ = ("_store", "pos")
+
+    def __init__(self, store: "CorpusStore", pos: int):
+        self._store = store
+        self.pos = pos
+
+    @property
+    def doc_id(self) -> str:
+        return str(self._store.doc_ids[self.pos])
+
+    @property
+    def text(self) -> str:
+        return self._store.texts[self.pos]
+
+
+class CorpusStore:
+    """
+    Read-only columnar corpus: doc ids, texts and a BM25 index, addressed by
+    integer position. `store[doc_id]` / `doc_id in store` keep the old
+    Dict[str, CorpusRow] access working.
+    """
+    __slots__ = ("doc_ids", "texts", "bm25", "_id_order")
+
+    def __init__(self, doc_ids: np.ndarray, texts: TextColumn, bm25: BM25Columns, id_order: np.ndarray):
+        self.doc_ids = doc_ids
+        self.texts = texts
+        self.bm25 = bm25
+        self._id_order = id_order  # positions sorted by doc id, for lookups
+
+    @classmethod
+    def build(cls, doc_ids: List[str], texts: List[str], tokenize) -> "CorpusStore":
+        ids = np.array(doc_ids, dtype=np.str_)
+        return cls(ids, TextColumn.from_strings(texts), BM25Columns.build([tokenize(t) for t in texts]), np.argsort(ids, kind="stable"))
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def position(self, doc_id: str) -> Optional[int]:
+        j = int(np.searchsorted(self.doc_ids, doc_id, sorter=self._id_order))
+        if j < len(self._id_order) and self.doc_ids[self._id_order[j]] == doc_id:
+            return int(self._id_order[j])
+        return None
+
+    def __contains__(self, doc_id: str) -> bool:
+        return self.position(doc_id) is not None
+
+    def __getitem__(self, doc_id: str) -> CorpusRow:
+        pos = self.position(doc_id)
+        if pos is None:
+            raise KeyError(doc_id)
+        return CorpusRow(self, pos)
+
+    def row(self, pos: int) -> CorpusRow:
+        return CorpusRow(self, pos)
+
+    # ---------- Persistence (memory-mapped) ----------
+    _ARRAYS = {
+        "doc_ids": lambda s: s.doc_ids,
+        "id_order": lambda s: s._id_order,
+        "text_buffer": lambda s: s.texts.buffer,
+        "text_offsets": lambda s: s.texts.offsets,
+        "bm25_terms": lambda s: s.bm25.terms,
+        "bm25_idf": lambda s: s.bm25.idf,
+        "bm25_indptr": lambda s: s.bm25.indptr,
+        "bm25_docs": lambda s: s.bm25.post_docs,
+        "bm25_tf": lambda s: s.bm25.post_tf,
+        "bm25_norm": lambda s: s.bm25.norm,
+    }
+
+    def save(self, path: str, source_hash: str = "") -> None:
+        """Write the store to a temporary directory next to `path`, then swap it in:
+        a half-written store is never visible, and processes that memory-mapped
+        the previous files keep reading them (rewriting them in place would not)."""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}-", dir=parent)
+        try:
+            for name, get in self._ARRAYS.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), get(self))
+            with open(os.path.join(tmp, "SOURCE"), "w") as f:
+                f.write(source_hash)
+            old = f"{tmp}.old"
+            if os.path.exists(path):
+                os.replace(path, old)
+            os.replace(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str) -> "CorpusStore":
+        a = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in cls._ARRAYS}
+        bm25 = BM25Columns(a["bm25_terms"], a["bm25_idf"], a["bm25_indptr"], a["bm25_docs"], a["bm25_tf"], a["bm25_norm"])
+        return cls(a["doc_ids"], TextColumn(a["text_buffer"], a["text_offsets"]), bm25, a["id_order"])
+
+    @staticmethod
+    def saved_source(path: str) -> Optional[str]:
+        try:
+            with open(os.path.join(path, "SOURCE")) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
@@ -1,6 +1,7 @@
 import os
+import sys
+import fcntl
 from typing import List, Dict, Tuple
-from dataclasses import dataclass
 import pandas as pd
 
 # LlamaIndex core
@@ -10,98 +11,156 @@ from llama_index.core import (
     Document,
     Settings,
 )
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.vector_stores.qdrant import QdrantVectorStore
 from llama_index.llms.openai import OpenAI
 
-# Nodes & postprocessors
-from llama_index.core.postprocessor import SentenceTransformerRerank
-
 # Qdrant
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, models
+
+# Shared across the apps: Qdrant client, models, BM25 sparse vectors (repo-level rag_engine package)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from rag_engine.config import QDRANT_HYBRID, DENSE_VECTOR_NAME, SPARSE_VECTOR_NAME
+from rag_engine.resources import get_client, new_client, get_embed_model
+from rag_engine.sparse import bm25_doc_vector
+from rag_engine.columns import BM25Columns, file_sha256
+from rag_engine.versioning import content_hash, store_content_hash
 
-# BM25
-from rank_bm25 import BM25Okapi
+# BM25 + columnar corpus
+from corpus_store import CorpusStore, CORPUS_STORE_DIR
 
 # =========================
 # CONFIG
 # =========================
-QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+# QDRANT_URL / QDRANT_PATH (local mode) / QDRANT_HYBRID: see rag_engine/config.py
 QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "maktek_faqs")
-EMBED_MODEL_NAME = "intfloat/multilingual-e5-base"
-RERANK_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
-
-K = 5  # we’ll evaluate @5 as requested
-# knobs
-VEC_TOP_K = max(12, K)      # gather more for better recall
-BM25_TOP_K = max(12, K)
-RERANK_TOP_N = max(8, K)
-FINAL_TOP_N = K  
+EMBEDDING_DIM = 768  # multilingual-e5-base (EMBED_MODEL_NAME in rag_engine/config.py)
+# resolved from this file, so the app also loads when imported from another directory
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "data.csv")
 
 # Optional LLM
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 LLM_TEMPERATURE = 0
 
-@dataclass
-class CorpusItem:
-    doc_id: str
-    text: str
-    metadata: Dict
+# Compact payload: the "Q: ... A: ..." text is stored once under TEXT_KEY
+# (the key LlamaIndex reads back), question/answer are derived from it.
+TEXT_KEY = "text"
+PAYLOAD_FIELDS = [TEXT_KEY, "doc_id", "source"]
+UPSERT_BATCH_SIZE = 64
 
 # -----------------------------
 # DATA LOADING
 # -----------------------------
+def faq_text(question: str, answer: str) -> str:
+    return f"Q: {question}\n\nA: {answer}"
+
+def split_faq_text(text: str) -> Tuple[str, str]:
+    """Recover (question, answer) from a faq_text() string."""
+    text = text or ""
+    if text.startswith("Q: ") and "\n\nA: " in text:
+        q, a = text[3:].split("\n\nA: ", 1)
+        return q.strip(), a.strip()
+    return "", text.strip()
+
+def faq_doc_id(faq_id: int) -> str:
+    """Doc id of the FAQ with data.csv's `id` (the ground truth's `id`)."""
+    return f"faq-{faq_id:04d}"
+
+def rows_to_documents(rows: List[Dict]) -> List[Document]:
+    docs: List[Document] = []
+    for i, row in enumerate(rows):
+        q = (row.get("question") or "").strip()
+        a = (row.get("answer") or "").strip()
+        # `id` survives the dedup in fetch_maktek_dataset, positions do not
+        doc_id = faq_doc_id(int(row["id"]) if pd.notna(row.get("id")) else i)
+        # question/answer live only in the text, not repeated in metadata
+        metadata = {"source": "MakTek", "doc_id": doc_id}
+        docs.append(Document(text=faq_text(q, a), metadata=metadata, doc_id=doc_id))
+    return docs
+
 def fetch_maktek_dataset() -> List[Document]:
     #ds = load_dataset("MakTek/Customer_support_faqs_dataset", split="train")
     df = pd.read_json("hf://datasets/MakTek/Customer_support_faqs_dataset/train_expanded.json", lines=True)
     df = df.drop_duplicates(subset="question")
     df.insert(0,'id',df.index)
-    df.to_csv("data/data.csv",index=False)
-    df_dict = df.to_dict(orient='records')
-    docs: List[Document] = []
-    for i, row in enumerate(df_dict):
-        q = (row.get("question") or "").strip()
-        a = (row.get("answer") or "").strip()
-        doc_id = f"faq-{i:04d}"
-        text = f"Q: {q}\n\nA: {a}"
-        metadata = {"question": q, "answer": a, "source": "MakTek", "doc_id": doc_id}
-        docs.append(Document(text=text, metadata=metadata, doc_id=doc_id))
-    return docs
+    df.to_csv(DATA_PATH,index=False)
+    return rows_to_documents(df.to_dict(orient='records'))
 
-def load_maktek_dataset(data_path : str = "data/data.csv") -> List[Document]:
+def load_maktek_dataset(data_path : str = DATA_PATH) -> List[Document]:
     df = pd.read_csv(data_path)
-    df_dict = df.to_dict(orient='records')
-    docs: List[Document] = []
-    for i, row in enumerate(df_dict):
-        q = (row.get("question") or "").strip()
-        a = (row.get("answer") or "").strip()
-        doc_id = f"faq-{i:04d}"
-        text = f"Q: {q}\n\nA: {a}"
-        metadata = {"question": q, "answer": a, "source": "MakTek", "doc_id": doc_id}
-        docs.append(Document(text=text, metadata=metadata, doc_id=doc_id))
-    return docs  
+    return rows_to_documents(df.to_dict(orient='records'))
 
 # -----------------------------
 # INDEX
 # -----------------------------
-def build_index(docs: List[Document]) -> VectorStoreIndex:
-    Settings.embed_model = HuggingFaceEmbedding(model_name=EMBED_MODEL_NAME)
-    client = QdrantClient(url=QDRANT_URL)
+def doc_payload(doc: Document) -> Dict:
+    """Compact point payload: text once, plus the ids needed to route results."""
+    return {TEXT_KEY: doc.text, "doc_id": doc.doc_id, "source": doc.metadata.get("source")}
+
+def create_collection(client: QdrantClient, hybrid: bool = QDRANT_HYBRID) -> None:
+    """(Re)create the FAQ collection with payloads kept on disk.
+
+    In hybrid mode the dense vector is named and a BM25 sparse vector is added;
+    Qdrant applies the IDF part of BM25 itself (Modifier.IDF).
+    """
+    if client.collection_exists(QDRANT_COLLECTION):
+        client.delete_collection(QDRANT_COLLECTION)
+    dense_config = models.VectorParams(size=EMBEDDING_DIM, distance=models.Distance.COSINE)
+    if hybrid:
+        client.create_collection(
+            collection_name=QDRANT_COLLECTION,
+            vectors_config={DENSE_VECTOR_NAME: dense_config},
+            sparse_vectors_config={SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)},
+            on_disk_payload=True,
+        )
+    else:
+        client.create_collection(
+            collection_name=QDRANT_COLLECTION,
+            vectors_config=dense_config,
+            on_disk_payload=True,
+        )
+    client.create_payload_index(QDRANT_COLLECTION, field_name="doc_id", field_schema=models.PayloadSchemaType.KEYWORD)
+
+def build_index(docs: List[Document], hybrid: bool = QDRANT_HYBRID) -> VectorStoreIndex:
+    Settings.embed_model = get_embed_model()
+    client = get_client()
+    create_collection(client, hybrid)
+    avgdl = sum(len(simple_tokenize(d.text)) for d in docs) / max(len(docs), 1)
+    for start in range(0, len(docs), UPSERT_BATCH_SIZE):
+        batch = docs[start:start + UPSERT_BATCH_SIZE]
+        vectors = Settings.embed_model.get_text_embedding_batch([d.text for d in batch])
+        if hybrid:
+            vectors = [
+                {DENSE_VECTOR_NAME: vec, SPARSE_VECTOR_NAME: bm25_doc_vector(simple_tokenize(d.text), avgdl)}
+                for d, vec in zip(batch, vectors)
+            ]
+        client.upsert(
+            collection_name=QDRANT_COLLECTION,
+            points=[
+                models.PointStruct(id=start + i, vector=vec, payload=doc_payload(d))
+                for i, (d, vec) in enumerate(zip(batch, vectors))
+            ],
+        )
+    store_content_hash(client, QDRANT_COLLECTION, content_hash(doc_payload(d) for d in docs))
     vector_store = QdrantVectorStore(client=client, collection_name=QDRANT_COLLECTION)
-    storage_context = StorageContext.from_defaults(vector_store=vector_store)
-    index = VectorStoreIndex.from_documents(docs, storage_context=storage_context, show_progress=True)
-    return index
+    return VectorStoreIndex.from_vector_store(vector_store=vector_store)
 
 # --------------------------
 # Connect to Qdrant collection
 # --------------------------
 def connect_to_index() -> VectorStoreIndex:
-    Settings.embed_model = HuggingFaceEmbedding(model_name=EMBED_MODEL_NAME)
-    client = QdrantClient(url=QDRANT_URL)
+    Settings.embed_model = get_embed_model()
+    client = get_client()
     vector_store = QdrantVectorStore(client=client, collection_name=QDRANT_COLLECTION)
     storage_context = StorageContext.from_defaults(vector_store=vector_store)
     return VectorStoreIndex.from_vector_store(vector_store=vector_store, storage_context=storage_context)
 
+def reconnect_index() -> VectorStoreIndex:
+    """Like connect_to_index() with a fresh Qdrant client, reusing the embedding
+    model already in Settings (used in forked workers: no model reload, and no
+    connection shared with the parent)."""
+    vector_store = QdrantVectorStore(client=new_client(), collection_name=QDRANT_COLLECTION)
+    return VectorStoreIndex.from_vector_store(vector_store=vector_store)
+
 
 
 #######
@@ -110,32 +169,39 @@ def simple_tokenize(s: str) -> List[str]:
     return s.lower().split()
 
 
-def build_bm25_corpus(docs: List[Document]) -> Tuple[BM25Okapi, Dict[str, CorpusItem]]:
-    corpus_items: Dict[str, CorpusItem] = {}
-    tokenized_corpus = []
-    for d in docs:
-        doc_id = d.doc_id or d.metadata.get("doc_id")
-        corpus_items[doc_id] = CorpusItem(doc_id=doc_id, text=d.text, metadata=d.metadata)
-        tokenized_corpus.append(simple_tokenize(d.text))
-    bm25 = BM25Okapi(tokenized_corpus)
-    return bm25, corpus_items
-
-# --------------------------
-# Reranker builder
-# --------------------------
-def build_reranker() -> SentenceTransformerRerank:
-    return SentenceTransformerRerank(model=RERANK_MODEL_NAME, top_n=RERANK_TOP_N)
+def build_bm25_corpus(docs: List[Document]) -> Tuple[BM25Columns, CorpusStore]:
+    store = CorpusStore.build(
+        [d.doc_id or d.metadata.get("doc_id") for d in docs],
+        [d.text for d in docs],
+        simple_tokenize,
+    )
+    return store.bm25, store
+
+def load_corpus_store(data_path: str = DATA_PATH, store_dir: str = CORPUS_STORE_DIR) -> CorpusStore:
+    """Memory-map the columnar corpus, (re)building it when the CSV changed.
+    Builds are serialized with a file lock: workers started together build it once."""
+    source = file_sha256(data_path)
+    if CorpusStore.saved_source(store_dir) != source:
+        os.makedirs(os.path.dirname(os.path.abspath(store_dir)), exist_ok=True)
+        with open(f"{store_dir}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if CorpusStore.saved_source(store_dir) != source:  # not built by another process meanwhile
+                _, store = build_bm25_corpus(load_maktek_dataset(data_path))
+                store.save(store_dir, source)
+    return CorpusStore.load(store_dir)
 
 def init_store_data_to_vector_db() -> Dict:
     docs = fetch_maktek_dataset()
     index = build_index(docs)
     return index
 
-def prepare_hybird_search(data_path : str = "data/data.csv") -> Dict:
-    docs = load_maktek_dataset(data_path)
+def prepare_hybird_search(data_path : str = DATA_PATH) -> Dict:
     index = connect_to_index()
-    bm25, corpus_items = build_bm25_corpus(docs)
+    if QDRANT_HYBRID:
+        # lexical search runs inside Qdrant; nothing corpus-sized is kept in process
+        return {"index": index, "bm25": None, "corpus_items": None}
+    corpus_items = load_corpus_store(data_path)
     return {
     "index": index,
-    "bm25": bm25,
+    "bm25": corpus_items.bm25,
     "corpus_items": corpus_items}
@@ -0,0 +1,103 @@
+import os
+import time
+import argparse
+from collections import Counter
+from typing import List, Dict, Callable, Optional
+import pandas as pd
+
+from data_ingestion import faq_doc_id
+from search_process import prepare_search, retrieve_hybrid_rerank, retrieve_cascade, FINAL_TOP_N
+
+GROUND_TRUTH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ground-truth-data.csv")
+
+
+# -----------------------------
+# METRICS
+# -----------------------------
+# A result matches when it is the ground-truth FAQ itself (doc id from the
+# ground truth's `id`), or when its answer equals the expected one after
+# normalization (data.csv repeats a few answers). No substring matching: an
+# empty or short answer is contained in every expected answer.
+def normalized(s: str) -> str:
+    return " ".join((s or "").split()).lower()
+
+def is_match(expected_id: Optional[str], expected_answer: str, result: Dict) -> bool:
+    if expected_id is not None and result.get("doc_id") == expected_id:
+        return True
+    e = normalized(expected_answer)
+    return bool(e) and normalized(result.get("answer")) == e
+
+def hit_rate_at_k(expected_id: Optional[str], expected_answer: str, results: List[Dict]) -> int:
+    """1 if any result is the expected FAQ, else 0."""
+    return int(any(is_match(expected_id, expected_answer, r) for r in results))
+
+def mrr_at_k(expected_id: Optional[str], expected_answer: str, results: List[Dict]) -> float:
+    for i, r in enumerate(results, 1):
+        if is_match(expected_id, expected_answer, r):
+            return 1.0 / i
+    return 0.0
+
+
+# -----------------------------
+# EVALUATION
+# -----------------------------
+def evaluate_mode(df: pd.DataFrame, retrieve: Callable[[str, Dict], List[Dict]]) -> pd.DataFrame:
+    """Run `retrieve(query, trace)` over the ground truth; one row per query."""
+    rows = []
+    for _, row in df.iterrows():
+        trace: Dict = {}
+        start = time.perf_counter()
+        results = retrieve(str(row["question"]), trace)
+        latency = time.perf_counter() - start
+        expected_id = faq_doc_id(int(row["id"])) if pd.notna(row.get("id")) else None
+        rows.append({
+            "query": row["question"],
+            "hit": hit_rate_at_k(expected_id, str(row["expected_answer"]), results),
+            "mrr": mrr_at_k(expected_id, str(row["expected_answer"]), results),
+            "latency_ms": latency * 1000,
+            "exit": trace.get("exit", "rerank"),
+        })
+    return pd.DataFrame(rows)
+
+def compare_cascade(csv_path: str = GROUND_TRUTH_PATH, prepare_dict: Dict = None, limit: int = None) -> pd.DataFrame:
+    """Full hybrid+rerank vs cascade on the ground-truth set, @FINAL_TOP_N for both;
+    the delta columns are the cascade's quality change against the full pipeline."""
+    prepare_dict = prepare_dict or prepare_search()
+    index, bm25, corpus = prepare_dict["index"], prepare_dict["bm25"], prepare_dict["corpus_items"]
+    df = pd.read_csv(csv_path)
+    if limit:
+        df = df.head(limit)
+
+    modes = {
+        "hybrid+rerank": lambda q, trace: retrieve_hybrid_rerank(index, bm25, corpus, q),
+        "cascade": lambda q, trace: retrieve_cascade(index, bm25, corpus, q, trace=trace),
+    }
+    summary = []
+    for name, fn in modes.items():
+        out = evaluate_mode(df, fn)
+        exits = Counter(out["exit"])
+        summary.append({
+            "mode": name,
+            "hit_rate": out["hit"].mean(),
+            "mrr": out["mrr"].mean(),
+            "avg_latency_ms": out["latency_ms"].mean(),
+            "p95_latency_ms": out["latency_ms"].quantile(0.95),
+            "rerank_skipped": 1 - exits.get("rerank", 0) / len(out) if name == "cascade" else 0.0,
+            "exits": dict(exits),
+        })
+    summary = pd.DataFrame(summary)
+    for metric in ("hit_rate", "mrr"):
+        summary[f"{metric}_delta"] = summary[metric] - summary[metric].iloc[0]
+    return summary.rename(columns={"hit_rate": f"hit_rate@{FINAL_TOP_N}", "mrr": f"mrr@{FINAL_TOP_N}"})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate cascade retrieval against the ground-truth set.")
+    parser.add_argument("--csv", default=GROUND_TRUTH_PATH)
+    parser.add_argument("--limit", type=int, default=None, help="only use the first N questions")
+    parser.add_argument("--report", default=None, help="also write the comparison to this CSV")
+    args = parser.parse_args()
+    summary = compare_cascade(args.csv, limit=args.limit)
+    if args.report:
+        summary.to_csv(args.report, index=False)
+    print(summary.to_string(index=False))
@@ -23,6 +23,8 @@ st.sidebar.header("⚙️ Settings")
 use_llm = st.sidebar.toggle("Use OpenAI LLM for final answer", value=False)
 
 st.sidebar.info("💡 You can turn off the LLM to see raw retrieval results.")
+profile_query = st.sidebar.toggle("🐞 Profile this query", value=False,
+                                  help="Saves stage timings, a flamegraph and a pstats dump (see the dashboard).")
 
 # Connect to vector DB
 st.sidebar.write("🔗 Connecting to Qdrant...")
@@ -47,7 +49,7 @@ if st.button("Search"):
 
     with st.spinner("🔍 Retrieving results..."):
         # Retrieve results (without LLM)
-        results = rag_service.retrieve_answers(query,prepared_dict)
+        results = rag_service.retrieve_answers(query,prepared_dict, debug=profile_query)
 
     st.subheader("📊 Retrieved Results")
     for i, r in enumerate(results, 1):
@@ -64,7 +66,7 @@ if st.button("Search"):
             st.error("⚠️ OPENAI_API_KEY is not set. Cannot run LLM answer.")
         else:
             with st.spinner("🤖 Generating final answer with OpenAI..."):
-                llm_answer = rag_service.generate_final_answer(query, results)
+                llm_answer = rag_service.generate_final_answer(query, results, debug=profile_query, prepared_dict=prepared_dict)
 
             st.subheader("🤖 Final LLM Answer")
             st.write(llm_answer["answer"])
@@ -2,7 +2,9 @@ import streamlit as st
 import pandas as pd
 import sys , os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 from backend.feedback_service import load_feedback_df
+from rag_engine.profiling import recent_profiles, hot_functions, pstats_summary, PROFILE_SLOW_MS
 import plotly.express as px
 import os
 
@@ -45,3 +47,38 @@ else:
     df["month"] = pd.to_datetime(df["timestamp"]).dt.to_period("M")
     fig5 = px.bar(df.groupby("month")["rating"].mean().reset_index(), x="month", y="rating", title="📆 Avg Monthly Rating")
     st.plotly_chart(fig5, use_container_width=True)
+
+# 🐢 --- Slow / profiled queries ---
+st.header("🐢 Slow Queries")
+st.caption(f"Requests slower than PROFILE_SLOW_MS ({PROFILE_SLOW_MS or 'off'} ms) and queries run with 🐞 profiling.")
+profiles = recent_profiles()
+if not profiles:
+    st.info("No profiles recorded yet.")
+else:
+    st.dataframe(pd.DataFrame([{
+        "time": pd.to_datetime(p["started_at"], unit="s"),
+        "kind": p["kind"],
+        "trigger": p["trigger"],
+        "total_ms": p["total_ms"],
+        "query": p["query"],
+        "id": p["id"],
+    } for p in profiles]))
+
+    chosen = st.selectbox("Inspect profile:", profiles, format_func=lambda p: f"{p['total_ms']:.0f} ms · {p['query'][:80]} ({p['id']})")
+    if chosen.get("error"):
+        st.error(chosen["error"])
+    if chosen["stages"]:
+        st.plotly_chart(px.bar(pd.DataFrame(chosen["stages"]), x="ms", y="stage", orientation="h", title="⏱️ Stage timings"), use_container_width=True)
+    hot = hot_functions(chosen)
+    if hot:
+        st.subheader("🔥 Hot functions (sampled self time)")
+        st.dataframe(pd.DataFrame(hot))
+    summary = pstats_summary(chosen)
+    if summary:
+        with st.expander("📄 cProfile (cumulative)"):
+            st.code(summary)
+    for label, path in chosen["files"].items():
+        if not os.path.exists(path):  # pruned since the list was read
+            continue
+        with open(path, "rb") as f:
+            st.download_button(f"⬇️ {label} ({os.path.basename(path)})", f.read(), file_name=os.path.basename(path), key=path)
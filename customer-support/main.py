@@ -3,6 +3,8 @@ import os
 import sys
 import subprocess
 import time
+import argparse
+import urllib.request
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -19,28 +21,62 @@ if not os.path.exists(os.path.join(PROJECT_ROOT, "backend", "__init__.py")):
 APP_PATH = os.path.join(PROJECT_ROOT, "frontend", "app.py")
 DASHBOARD_PATH = os.path.join(PROJECT_ROOT, "frontend", "dashboard.py")
 
-if not os.path.exists(APP_PATH) or not os.path.exists(DASHBOARD_PATH):
-    raise FileNotFoundError("❌ Could not find app.py or dashboard.py")
 
-# Start both apps on different ports
-print("🚀 Launching FAQ RAG App (port 8501)...")
-app_proc = subprocess.Popen(["streamlit", "run", APP_PATH, "--server.port", "8501"])
+def wait_until_healthy(port: int, proc: subprocess.Popen, timeout: float = 60.0) -> bool:
+    """Poll Streamlit's health endpoint instead of sleeping a fixed time."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and proc.poll() is None:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.2)
+    return False
 
-# Small delay to avoid conflicts
-time.sleep(3)
 
-print("📊 Launching Admin Dashboard (port 8502)...")
-dash_proc = subprocess.Popen(["streamlit", "run", DASHBOARD_PATH, "--server.port", "8502"])
+def run_apps():
+    if not os.path.exists(APP_PATH) or not os.path.exists(DASHBOARD_PATH):
+        raise FileNotFoundError("❌ Could not find app.py or dashboard.py")
 
-print("\n✅ Both apps are running!")
-print("🌐 User App:       http://localhost:8501")
-print("🔐 Admin Dashboard: http://localhost:8502")
+    # Start both apps on different ports
+    print("🚀 Launching FAQ RAG App (port 8501)...")
+    app_proc = subprocess.Popen(["streamlit", "run", APP_PATH, "--server.port", "8501"])
 
-# Keep the script running to maintain subprocesses
-try:
-    app_proc.wait()
-    dash_proc.wait()
-except KeyboardInterrupt:
-    print("\n🛑 Shutting down...")
-    app_proc.terminate()
-    dash_proc.terminate()
+    # Wait until the first app answers before starting the second
+    if not wait_until_healthy(8501, app_proc):
+        print("⚠️ FAQ RAG App is not healthy yet; starting the dashboard anyway")
+
+    print("📊 Launching Admin Dashboard (port 8502)...")
+    dash_proc = subprocess.Popen(["streamlit", "run", DASHBOARD_PATH, "--server.port", "8502"])
+    wait_until_healthy(8502, dash_proc)
+
+    print("\n✅ Both apps are running!")
+    print("🌐 User App:       http://localhost:8501")
+    print("🔐 Admin Dashboard: http://localhost:8502")
+
+    # Keep the script running to maintain subprocesses
+    try:
+        app_proc.wait()
+        dash_proc.wait()
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down...")
+        app_proc.terminate()
+        dash_proc.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Customer-support FAQ RAG")
+    sub = parser.add_subparsers(dest="mode")
+    sub.add_parser("apps", help="run the Streamlit app + dashboard (default)")
+    serve_parser = sub.add_parser("serve", help="preload once, fork N search workers (HTTP JSON API)")
+    serve_parser.add_argument("--workers", type=int, default=int(os.getenv("SEARCH_WORKERS", "2")))
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.mode == "serve":
+        from search_server import serve
+        serve(args.workers, args.host, args.port)
+    else:
+        run_apps()
@@ -1,42 +1,170 @@
 import os
-from typing import List, Dict, Tuple
+import logging
+from typing import List, Dict, Tuple, Optional, Union
 from llama_index.core import (
-    VectorStoreIndex
+    VectorStoreIndex,
 )
 from llama_index.llms.openai import OpenAI
-from llama_index.core.schema import TextNode, NodeWithScore
-from rank_bm25 import BM25Okapi
-from data_ingestion import prepare_hybird_search , simple_tokenize , CorpusItem , build_reranker
-
-QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
-QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "maktek_faqs")
-EMBED_MODEL_NAME = "intfloat/multilingual-e5-base"
-RERANK_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+from qdrant_client import models
+from data_ingestion import prepare_hybird_search , simple_tokenize , split_faq_text , TEXT_KEY , PAYLOAD_FIELDS
+from data_ingestion import CorpusStore , BM25Columns , CORPUS_STORE_DIR , DATA_PATH
+from rag_engine.config import QDRANT_HYBRID , DENSE_VECTOR_NAME , SPARSE_VECTOR_NAME
+from rag_engine.sparse import bm25_query_vector
+from rag_engine.profiling import profile_request , stage
+from rag_engine.result_cache import RESULT_CACHE , get_cache , semantic_threshold
+from rag_engine.resources import embed_query , get_cross_encoder
+from rag_engine.versioning import collection_version
+from rag_engine.tuning import config_path , load_params
+from cascade import adaptive_depth , rrf_merge , cascade_exit
+
 K = 5  # we’ll evaluate @5 as requested
-# knobs
-VEC_TOP_K = max(12, K)      # gather more for better recall
-BM25_TOP_K = max(12, K)
-RERANK_TOP_N = max(8, K)
-FINAL_TOP_N = K  
+# knobs: hand-picked defaults, overridden by the tuned retrieval_config.json (see autotune.py).
+# They are loaded here only; other modules import them from search_process.
+RETRIEVAL_CONFIG = config_path(os.path.dirname(os.path.abspath(__file__)), "FAQ_RETRIEVAL_CONFIG")
+_knobs = load_params(
+    RETRIEVAL_CONFIG,
+    VEC_TOP_K=max(12, K),       # gather more for better recall
+    BM25_TOP_K=max(12, K),
+    RERANK_TOP_N=max(8, K),
+    FINAL_TOP_N=K,
+    # cascade thresholds (set by hand in the same file; autotune.py does not sweep them)
+    CASCADE_DENSE_MARGIN=0.03,       # dense top1 - top2 (cosine) required for the agreement exit
+    CASCADE_BM25_MARGIN=0.25,        # (bm25 top1 - top2) / top1 required for the agreement exit
+    CASCADE_DENSE_ONLY_MARGIN=0.12,  # dense margin that exits on its own; 0 disables
+    CASCADE_DENSE_WINDOW=0.08,       # adaptive depth: keep dense hits within this of the best
+    CASCADE_BM25_FLOOR=0.5,          # adaptive depth: keep bm25 hits >= this fraction of the best
+    RERANK_MAX_CANDIDATES=10,
+)
+VEC_TOP_K = _knobs["VEC_TOP_K"]
+BM25_TOP_K = _knobs["BM25_TOP_K"]
+RERANK_TOP_N = _knobs["RERANK_TOP_N"]
+FINAL_TOP_N = _knobs["FINAL_TOP_N"]
+
+# Cascade mode: skip the cross-encoder when dense and BM25 clearly agree
+CASCADE_ENABLED = os.getenv("SEARCH_CASCADE", "false").lower() == "true"
+CASCADE_DENSE_MARGIN = _knobs["CASCADE_DENSE_MARGIN"]
+CASCADE_BM25_MARGIN = _knobs["CASCADE_BM25_MARGIN"]
+CASCADE_DENSE_ONLY_MARGIN = _knobs["CASCADE_DENSE_ONLY_MARGIN"]
+CASCADE_DENSE_WINDOW = _knobs["CASCADE_DENSE_WINDOW"]
+CASCADE_BM25_FLOOR = _knobs["CASCADE_BM25_FLOOR"]
+RERANK_MAX_CANDIDATES = _knobs["RERANK_MAX_CANDIDATES"]
 
+# Result cache warm-up: most frequent feedback-table questions pre-run at startup (0 disables)
+CACHE_WARM_QUERIES = int(os.getenv("CACHE_WARM_QUERIES", "50"))
+# Semantic cache tier for FAQ searches/answers: off unless set. e5 embeddings of
+# short FAQ questions sit at a high baseline cosine, so two different questions
+# ("What is your email newsletter about?" / "How do I unsubscribe from your
+# newsletter?") can pass a 0.95 threshold and be served each other's results.
+FAQ_CACHE_SEMANTIC_THRESHOLD = semantic_threshold("FAQ_CACHE_SEMANTIC_THRESHOLD", "")
+
+logger = logging.getLogger(__name__)
 
  
 
 # -----------------------------
-# RETRIEVAL HELPERS
+# QDRANT (field-selective fetches)
+# -----------------------------
+# embed_query (memoized) and the cross-encoder are shared with the other apps, see rag_engine/resources.py
+def dense_candidates(index: VectorStoreIndex, query: str, top_k: int = VEC_TOP_K) -> List[Tuple[str, float]]:
+    """Dense candidate generation: only doc_id and score come back over the wire."""
+    store = index.vector_store
+    with stage("embed"):
+        vector = embed_query(query)
+    with stage("qdrant_dense"):
+        hits = store.client.query_points(
+            collection_name=store.collection_name,
+            query=vector,
+            using=DENSE_VECTOR_NAME if QDRANT_HYBRID else None,
+            limit=top_k,
+            with_payload=["doc_id"],
+            with_vectors=False,
+        ).points
+    return [(h.payload["doc_id"], float(h.score)) for h in hits]
+
+def fetch_texts(index: VectorStoreIndex, doc_ids: List[str]) -> Dict[str, str]:
+    """Fetch the stored text for a handful of doc_ids (final top-N only)."""
+    if not doc_ids:
+        return {}
+    store = index.vector_store
+    with stage("qdrant_fetch"):
+        points, _ = store.client.scroll(
+            collection_name=store.collection_name,
+            scroll_filter=models.Filter(must=[
+                models.FieldCondition(key="doc_id", match=models.MatchAny(any=list(doc_ids)))
+            ]),
+            limit=len(doc_ids),
+            with_payload=PAYLOAD_FIELDS,
+            with_vectors=False,
+        )
+    return {p.payload["doc_id"]: p.payload.get(TEXT_KEY, "") for p in points}
+
+def server_hybrid_candidates(index: VectorStoreIndex, query: str, limit: int) -> Tuple[List[Tuple[str, float]], Dict[str, str]]:
+    """One Qdrant round-trip: dense + BM25 sparse prefetch, fused server-side (RRF).
+    Returns the fused (doc_id, score) list and the texts that came with it."""
+    store = index.vector_store
+    with stage("embed"):
+        vector = embed_query(query)
+    with stage("qdrant_hybrid"):
+        hits = store.client.query_points(
+            collection_name=store.collection_name,
+            prefetch=[
+                models.Prefetch(query=vector, using=DENSE_VECTOR_NAME, limit=VEC_TOP_K),
+                models.Prefetch(query=bm25_query_vector(simple_tokenize(query)), using=SPARSE_VECTOR_NAME, limit=BM25_TOP_K),
+            ],
+            query=models.FusionQuery(fusion=models.Fusion.RRF),
+            limit=limit,
+            with_payload=PAYLOAD_FIELDS,
+            with_vectors=False,
+        ).points
+    scored = [(h.payload["doc_id"], float(h.score)) for h in hits]
+    return scored, {h.payload["doc_id"]: h.payload.get(TEXT_KEY, "") for h in hits}
+
+# -----------------------------
+# CANDIDATES (corpus positions, no node objects)
 # -----------------------------
-def as_results(nodes: List[NodeWithScore]) -> List[Dict]:
-    """Convert NodeWithScore → dict rows."""
+# Candidates are (key, score) pairs where key is the integer position in the
+# columnar corpus. Doc ids the local corpus does not know keep their string id
+# and have their text fetched from Qdrant if they are needed.
+def to_positions(corpus: Optional[CorpusStore], scored: List[Tuple[str, float]]) -> List[Tuple[Union[int, str], float]]:
     out = []
-    for n in nodes[:FINAL_TOP_N]:
-        out.append({
-            "doc_id": n.metadata.get("doc_id") if n.metadata else n.node.node_id,
-            "question": n.metadata.get("question", ""),
-            "answer": n.metadata.get("answer", ""),
-            "score": float(n.score or 0.0),
-        })
+    for did, sc in scored:
+        pos = corpus.position(did) if corpus is not None else None
+        out.append((did if pos is None else pos, sc))
     return out
 
+def candidate_texts(index: VectorStoreIndex, corpus: Optional[CorpusStore], keys: List[Union[int, str]]) -> Dict[Union[int, str], str]:
+    texts: Dict[Union[int, str], str] = {k: corpus.texts[k] for k in keys if isinstance(k, int)}
+    texts.update(fetch_texts(index, [k for k in keys if not isinstance(k, int)]))
+    return texts
+
+def key_doc_id(corpus: Optional[CorpusStore], key: Union[int, str]) -> str:
+    return str(corpus.doc_ids[key]) if isinstance(key, int) else key
+
+def rerank(query: str, scored: List[Tuple[Union[int, str], float]], texts: Dict) -> List[Tuple[Union[int, str], float]]:
+    """Cross-encoder stage: score (query, text) pairs, keep the RERANK_TOP_N best."""
+    keys = [k for k, _ in scored if k in texts]
+    if not keys:
+        return []
+    with stage("rerank"):
+        scores = get_cross_encoder().predict([(query, texts[k]) for k in keys])
+    ranked = sorted(zip(keys, (float(x) for x in scores)), key=lambda x: x[1], reverse=True)
+    return ranked[:RERANK_TOP_N]
+
+def to_results(corpus: Optional[CorpusStore], scored: List[Tuple[Union[int, str], float]], texts: Dict) -> List[Dict]:
+    """Result rows for the final top-N only; question/answer are split from the text here."""
+    out = []
+    for key, sc in scored:
+        if key not in texts:
+            continue
+        question, answer = split_faq_text(texts[key])
+        out.append({"doc_id": key_doc_id(corpus, key), "question": question, "answer": answer, "score": float(sc)})
+        if len(out) >= FINAL_TOP_N:
+            break
+    return out
+
+# -----------------------------
+# RETRIEVAL HELPERS
+# -----------------------------
 def dedup_exact_question(rows: List[Dict]) -> List[Dict]:
     """Keep only the first instance of identical question text (case-insensitive)."""
     seen = set()
@@ -51,40 +179,135 @@ def dedup_exact_question(rows: List[Dict]) -> List[Dict]:
     return uniq
 
 
-def retrieve_hybrid_rerank(index: VectorStoreIndex, bm25: BM25Okapi, corpus: Dict[str, CorpusItem], query: str) -> List[Dict]:
-    # stage 1: gather candidates (same as hybrid)
-    v_nodes = index.as_retriever(similarity_top_k=VEC_TOP_K).retrieve(query)
+def bm25_candidates(bm25: BM25Columns, corpus: CorpusStore, query: str, top_k: int = BM25_TOP_K) -> List[Tuple[int, float]]:
+    """(corpus position, score) of the top_k BM25 hits."""
+    with stage("bm25"):
+        return bm25.top_k(simple_tokenize(query), top_k)
 
-    scores = bm25.get_scores(simple_tokenize(query))
-    doc_ids = list(corpus.keys())
-    ranked = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)[:BM25_TOP_K]
-    b_nodes: List[NodeWithScore] = []
-    for idx, sc in ranked:
-        did = doc_ids[idx]
-        item = corpus[did]
-        b_nodes.append(NodeWithScore(node=TextNode(id_=did, text=item.text, metadata=item.metadata), score=float(sc)))
+def gather_candidates(index: VectorStoreIndex, bm25: BM25Columns, corpus: CorpusStore, query: str) -> Tuple[List[Tuple[Union[int, str], float]], Dict]:
+    """Stage 1: dense + BM25 candidates merged by position, plus their texts."""
+    if bm25 is None:
+        # stateless mode: lexical + dense both run inside Qdrant
+        return server_hybrid_candidates(index, query, VEC_TOP_K + BM25_TOP_K)
 
-    # merge by doc_id
-    merged: Dict[str, NodeWithScore] = {}
-    for n in v_nodes + b_nodes:
-        did = n.metadata.get("doc_id") if n.metadata else n.node.node_id
-        if did not in merged or (merged[did].score or 0) < (n.score or 0):
-            merged[did] = n
+    v_scored = to_positions(corpus, dense_candidates(index, query, VEC_TOP_K))
+    b_scored = bm25_candidates(bm25, corpus, query, BM25_TOP_K)
+
+    # merge by position
+    merged: Dict[Union[int, str], float] = {}
+    for key, sc in v_scored + b_scored:
+        if key not in merged or merged[key] < sc:
+            merged[key] = sc
+    return list(merged.items()), candidate_texts(index, corpus, list(merged))
+
+
+def retrieve_hybrid_rerank(index: VectorStoreIndex, bm25: BM25Columns, corpus: CorpusStore, query: str) -> List[Dict]:
+    # stage 1: gather candidates
+    candidates, texts = gather_candidates(index, bm25, corpus, query)
 
     # stage 2: rerank with cross-encoder
-    reranker = build_reranker()
-    reranked = reranker.postprocess_nodes(list(merged.values()), query_str=query)
+    reranked = rerank(query, candidates, texts)
 
-    rows = as_results(reranked)
+    rows = to_results(corpus, reranked, texts)
     return dedup_exact_question(rows)
 
 # --------------------------
-# Query (Retrieval Only)
+# Cascade (early exit before reranking; the rules are in cascade.py)
+# --------------------------
+def retrieve_cascade(index: VectorStoreIndex, bm25: BM25Columns, corpus: CorpusStore, query: str, trace: Optional[Dict] = None) -> List[Dict]:
+    """
+    Cascade variant of retrieve_hybrid_rerank:
+      1. dense + BM25 candidates (ids and scores only)
+      2. early exit without the cross-encoder when an agreement/margin rule fires
+      3. otherwise rerank at most RERANK_MAX_CANDIDATES, with depth adapted to
+         how spread out each list's scores are
+    `trace`, if given, receives the exit taken and the number of reranked candidates.
+    """
+    if bm25 is None:
+        # server-side hybrid has no separate lexical ranking to compare against
+        candidates, texts = gather_candidates(index, bm25, corpus, query)
+        exit_, n_rerank = "full", len(candidates)
+        rows = dedup_exact_question(to_results(corpus, rerank(query, candidates, texts), texts))
+    else:
+        v_scored = to_positions(corpus, dense_candidates(index, query, VEC_TOP_K))
+        b_scored = bm25_candidates(bm25, corpus, query, BM25_TOP_K)
+        exit_ = cascade_exit(v_scored, b_scored, CASCADE_DENSE_MARGIN, CASCADE_BM25_MARGIN, CASCADE_DENSE_ONLY_MARGIN)
+        if exit_:
+            # no rerank: RRF order, text only for the final top-N
+            fused = rrf_merge(v_scored, b_scored)[:FINAL_TOP_N]
+            texts = candidate_texts(index, corpus, [k for k, _ in fused])
+            rows = dedup_exact_question(to_results(corpus, fused, texts))
+            n_rerank = 0
+        else:
+            exit_ = "rerank"
+            v_keep = adaptive_depth(v_scored, window=CASCADE_DENSE_WINDOW)
+            b_keep = adaptive_depth(b_scored, floor=CASCADE_BM25_FLOOR)
+            candidates = rrf_merge(v_keep, b_keep)[:RERANK_MAX_CANDIDATES]
+            n_rerank = len(candidates)
+            texts = candidate_texts(index, corpus, [k for k, _ in candidates])
+            rows = dedup_exact_question(to_results(corpus, rerank(query, candidates, texts), texts))
+
+    logger.info("cascade exit=%s reranked=%d query=%r", exit_, n_rerank, query)
+    if trace is not None:
+        trace["exit"] = exit_
+        trace["reranked"] = n_rerank
+    return rows
+
+# --------------------------
+# Result cache (see rag_engine/result_cache.py)
 # --------------------------
-def query_without_llm(index: VectorStoreIndex,bm25: BM25Okapi, corpus: Dict[str, CorpusItem], query: str) -> List[Dict]:
-    result = retrieve_hybrid_rerank(index, bm25, corpus, query)
+def index_version(index: VectorStoreIndex, corpus: Optional[CorpusStore]) -> str:
+    """What cached results depend on: the content hash stored with the Qdrant
+    collection at ingest and the source hash saved with the columnar corpus
+    (absent in server-side hybrid mode). Both are read back, not recomputed."""
+    store = index.vector_store
+    source = CorpusStore.saved_source(CORPUS_STORE_DIR) if corpus is not None else None
+    return f"{store.collection_name}:{collection_version(store.client, store.collection_name)}:{source or '-'}"
+
+def cached(name: str, query: str, version_fn, compute, use_cache: bool = True):
+    """Serve compute() through the named result cache: exact, then semantic tier (if enabled)."""
+    if not (RESULT_CACHE and use_cache):
+        return compute()
+    cache = get_cache(name, FAQ_CACHE_SEMANTIC_THRESHOLD)
+    with stage("cache"):
+        cache.sync(version_fn)
+        result, tier = cache.get(query, embed_query)
+    if result is not None:
+        logger.info("cache hit cache=%s tier=%s query=%r", name, tier, query)
+        return result
+    result = compute()
+    cache.put(query, result, embed_query)
     return result
 
+def warm_cache(prepare_dict: Dict, limit: int = CACHE_WARM_QUERIES) -> int:
+    """Run the most frequent questions from the feedback table once, so they start as cache hits."""
+    if not RESULT_CACHE or limit <= 0:
+        return 0
+    try:
+        from backend.feedback_service import top_queries
+        queries = top_queries(limit)
+    except Exception as e:  # no database (or driver) is not an error for search
+        logger.warning("result cache warm-up skipped: %s", e)
+        return 0
+    for q in queries:
+        query_without_llm(prepare_dict['index'], prepare_dict['bm25'], prepare_dict['corpus_items'], q)
+    logger.info("result cache warmed with %d queries", len(queries))
+    return len(queries)
+
+# --------------------------
+# Query (Retrieval Only)
+# --------------------------
+def query_without_llm(index: VectorStoreIndex,bm25: BM25Columns, corpus: CorpusStore, query: str, debug: bool = False, use_cache: bool = True) -> List[Dict]:
+    # profiled when debug=True or when slower than PROFILE_SLOW_MS (see profiling.py);
+    # debug requests bypass the cache so the whole pipeline is measured
+    def retrieve() -> List[Dict]:
+        if CASCADE_ENABLED:
+            return retrieve_cascade(index, bm25, corpus, query)
+        return retrieve_hybrid_rerank(index, bm25, corpus, query)
+
+    with profile_request(query, "search", debug):
+        return cached("search", query, lambda: index_version(index, corpus), retrieve, use_cache and not debug)
+
 
 # --------------------------
 # Query (With LLM)
@@ -107,7 +330,8 @@ Return a concise, direct answer.
 """
 
     llm = OpenAI(model=model, temperature=0)
-    completion = llm.complete(prompt)
+    with stage("llm"):
+        completion = llm.complete(prompt)
 
     return {
         "query": query,
@@ -115,14 +339,23 @@ Return a concise, direct answer.
         "top_context": vector_result
     }
 
-def prepare_search(data_path : str = "data/data.csv") -> Dict:
+def prepare_search(data_path : str = DATA_PATH) -> Dict:
     result = prepare_hybird_search(data_path)
     return result
 
-def do_search(query: str , prepare_dict : Dict, model : str ="gpt-3.5-turbo") -> Dict:
-    vector_result = query_without_llm(prepare_dict['index'],prepare_dict['bm25'],prepare_dict['corpus_items'], query)
-    result = query_with_llm(query,vector_result,model)
-    return result
+def cached_answer(index: VectorStoreIndex, corpus: CorpusStore, query: str, answer_fn, model: str = "gpt-3.5-turbo", debug: bool = False) -> Dict:
+    """LLM answers are cached per model, next to (and versioned like) the search results."""
+    return cached(f"answer:{model}", query, lambda: index_version(index, corpus), answer_fn, not debug)
+
+def do_search(query: str , prepare_dict : Dict, model : str ="gpt-3.5-turbo", debug: bool = False) -> Dict:
+    index, bm25, corpus = prepare_dict['index'], prepare_dict['bm25'], prepare_dict['corpus_items']
+
+    def answer() -> Dict:
+        vector_result = query_without_llm(index, bm25, corpus, query, debug=debug)
+        return query_with_llm(query, vector_result, model)
+
+    with profile_request(query, "answer", debug):
+        return cached_answer(index, corpus, query, answer, model, debug)
 
 def test_query(prepare_dict, query: str):
     results = query_without_llm(
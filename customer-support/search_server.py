@@ -0,0 +1,263 @@
+# search_server.py
+"""
+Preload-then-fork search server.
+
+The parent process loads everything once (embedding model, cross-encoder,
+columnar corpus + BM25, Qdrant index), runs a warm-up query, then forks
+worker processes that inherit those pages copy-on-write and share one
+listening socket. A worker counts as ready only after it has answered its own
+warm-up query; crashed workers are restarted.
+
+    python main.py serve --workers 4 --port 8000
+    curl "localhost:8000/search?q=How do I reset my password?"
+
+Endpoints: /search?q=...  /answer?q=...  (LLM, needs OPENAI_API_KEY)  /health
+`kill -USR1 <parent pid>` prints per-worker RSS vs shared memory.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import signal
+import select
+import socket
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, List, Tuple
+
+# Thread pools per process: N workers each starting an all-cores torch/OpenMP
+# pool oversubscribe the CPU, and an OpenMP pool started before fork() can hang
+# the children. Set before torch is imported; tokenizers' pool is not fork-safe.
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", "1"))
+os.environ.setdefault("OMP_NUM_THREADS", str(TORCH_THREADS))
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+WARMUP_QUERY = os.getenv("WARMUP_QUERY", "How do I reset my password?")
+READY_TIMEOUT = float(os.getenv("WORKER_READY_TIMEOUT", "120"))
+RESTART_BACKOFF = 1.0   # seconds to wait before restarting a worker that died right after start
+MIN_UPTIME = 5.0        # a worker that lived less than this counts as a failed start
+
+
+def limit_torch_threads() -> None:
+    """Cap torch intra-op threads at TORCH_THREADS (before any inference runs)."""
+    try:
+        import torch
+    except ImportError:  # torch comes with the embedder / cross-encoder; nothing to cap without it
+        return
+    torch.set_num_threads(TORCH_THREADS)
+
+
+# -----------------------------
+# MEMORY REPORT
+# -----------------------------
+def memory_usage(pid: int) -> Dict[str, float]:
+    """RSS / PSS / shared / private memory of a process in MB (Linux smaps_rollup)."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    except OSError:
+        return {}
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "shared": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0),
+        "private": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def memory_report(parent_pid: int, worker_pids: List[int]) -> str:
+    rows = [("parent", parent_pid)] + [(f"worker {i}", pid) for i, pid in enumerate(worker_pids)]
+    lines = [f"{'process':<10} {'pid':>7} {'rss MB':>9} {'shared MB':>10} {'private MB':>11} {'pss MB':>8}"]
+    total_pss = 0.0
+    for name, pid in rows:
+        m = memory_usage(pid)
+        if not m:
+            continue
+        total_pss += m["pss"]
+        lines.append(f"{name:<10} {pid:>7} {m['rss']:>9.1f} {m['shared']:>10.1f} {m['private']:>11.1f} {m['pss']:>8.1f}")
+    lines.append(f"total PSS (real memory for all processes): {total_pss:.1f} MB")
+    return "\n".join(lines)
+
+
+# -----------------------------
+# WORKER
+# -----------------------------
+def make_handler(search, answer):
+    class SearchHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: Dict):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = (parse_qs(url.query).get("q") or [""])[0].strip()
+            try:
+                if url.path == "/health":
+                    self._send(200, {"status": "ok", "pid": os.getpid()})
+                elif url.path in ("/search", "/answer"):
+                    if not query:
+                        self._send(400, {"error": "missing ?q="})
+                        return
+                    if url.path == "/answer":
+                        self._send(200, answer(query))
+                    else:
+                        self._send(200, {"query": query, "results": search(query)})
+                else:
+                    self._send(404, {"error": "not found"})
+            except Exception as e:  # keep the worker alive on a bad request
+                self._send(500, {"error": str(e)})
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return SearchHandler
+
+
+def run_worker(sock: socket.socket, ready_fd: int, prepare_dict: Dict) -> None:
+    """Child process: own Qdrant connection, warm-up query, then serve forever."""
+    from data_ingestion import reconnect_index
+    from rag_engine.config import QDRANT_PATH
+    from search_process import query_without_llm, do_search
+
+    limit_torch_threads()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # the parent handles Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+    if not QDRANT_PATH:
+        # HTTP/gRPC connections must not be shared with the parent
+        prepare_dict = {**prepare_dict, "index": reconnect_index()}
+
+    def search(query: str, use_cache: bool = True):
+        return query_without_llm(prepare_dict["index"], prepare_dict["bm25"], prepare_dict["corpus_items"], query, use_cache=use_cache)
+
+    def answer(query: str):
+        # same path as the Streamlit app: answer cache and profiler included
+        return do_search(query, prepare_dict)
+
+    search(WARMUP_QUERY, use_cache=False)  # exercise this worker's own pipeline, not the inherited cache
+    os.write(ready_fd, f"{os.getpid()}\n".encode())
+    os.close(ready_fd)
+
+    server = HTTPServer(sock.getsockname(), make_handler(search, answer), bind_and_activate=False)
+    server.socket = sock
+    server.serve_forever()
+
+
+# -----------------------------
+# PARENT (preload, fork, supervise)
+# -----------------------------
+class PreforkServer:
+    def __init__(self, workers: int = 2, host: str = "0.0.0.0", port: int = 8000):
+        self.n_workers = workers
+        self.host = host
+        self.port = port
+        self.workers: Dict[int, float] = {}   # pid -> start time
+        self.stopping = False
+
+    def preload(self) -> Dict:
+        """Load models, corpus and index once, and run one query so lazily
+        loaded pieces (cross-encoder, tokenizers) are loaded before forking."""
+        from search_process import prepare_search, query_without_llm, warm_cache, get_cross_encoder
+
+        limit_torch_threads()  # before the warm-up starts torch's pool in the parent
+        t0 = time.perf_counter()
+        prepare_dict = prepare_search()
+        get_cross_encoder()
+        query_without_llm(prepare_dict["index"], prepare_dict["bm25"], prepare_dict["corpus_items"], WARMUP_QUERY, use_cache=False)
+        warmed = warm_cache(prepare_dict)  # workers inherit the warm result cache
+        print(f"📦 Preloaded models and corpus ({warmed} cached queries) in {time.perf_counter() - t0:.1f}s")
+        # objects created so far are never collected: keeps GC from writing to
+        # (and un-sharing) the inherited pages in every worker
+        gc.collect()
+        gc.freeze()
+        return prepare_dict
+
+    def spawn(self, sock: socket.socket, prepare_dict: Dict) -> Tuple[int, int]:
+        """Fork one worker; returns its pid and the read end of its ready pipe."""
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            code = 0
+            try:
+                run_worker(sock, ready_w, prepare_dict)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(ready_w)
+        self.workers[pid] = time.monotonic()
+        return pid, ready_r
+
+    def wait_ready(self, pid: int, ready_r: int) -> None:
+        """Block until the worker answered its warm-up query (or died / timed out)."""
+        ready, _, _ = select.select([ready_r], [], [], READY_TIMEOUT)
+        line = os.read(ready_r, 64) if ready else b""
+        os.close(ready_r)
+        if line.strip() == str(pid).encode():
+            print(f"✅ worker {pid} ready")
+        else:
+            print(f"⚠️ worker {pid} did not become ready")
+
+    def report(self, *_):
+        print(memory_report(os.getpid(), list(self.workers)), flush=True)
+
+    def stop(self, *_):
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        prepare_dict = self.preload()
+        sock = socket.create_server((self.host, self.port), reuse_port=False, backlog=128)
+        sock.set_inheritable(True)
+
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGUSR1, self.report)
+
+        # fork all workers first, then wait: warm-up queries run in parallel
+        started = [self.spawn(sock, prepare_dict) for _ in range(self.n_workers)]
+        for pid, ready_r in started:
+            self.wait_ready(pid, ready_r)
+        print(f"🚀 Serving on http://{self.host}:{self.port} with {self.n_workers} workers (parent pid {os.getpid()})")
+        self.report()
+
+        # supervise: restart workers that exit while we are not shutting down
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            started = self.workers.pop(pid, None)
+            if self.stopping or started is None:
+                continue
+            print(f"💥 worker {pid} exited (status {status}); restarting")
+            if time.monotonic() - started < MIN_UPTIME:
+                time.sleep(RESTART_BACKOFF)
+            self.wait_ready(*self.spawn(sock, prepare_dict))
+            self.report()
+        sock.close()
+        print("🛑 Shut down")
+
+
+def serve(workers: int = 2, host: str = "0.0.0.0", port: int = 8000) -> None:
+    if not hasattr(os, "fork"):
+        sys.exit("Preload-then-fork serving needs os.fork (Linux/macOS).")
+    PreforkServer(workers, host, port).run()
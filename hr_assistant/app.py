@@ -1,6 +1,8 @@
 import streamlit as st
 import os
-from chatbot_backend import answer_policy_question
+from chatbot_backend import answer_policy_question, get_structure
+from article_filters import ArticleFilter
+from rag_engine.profiling import recent_profiles, hot_functions, PROFILE_SLOW_MS
 
 st.set_page_config(page_title="Saudi Labor Law Assistant", layout="wide")
 
@@ -46,6 +48,12 @@ if not st.session_state.openai_api_key:
     st.warning("🔒 Please add your OpenAI API key in the sidebar to unlock the assistant. / الرجاء إدخال مفتاح OpenAI لتفعيل المساعد.")
     st.stop()
 
+st.sidebar.header("🐞 Debug")
+profile_query = st.sidebar.checkbox(
+    "Profile this question",
+    help="Saves stage timings, a flamegraph and a pstats dump for the next answer.",
+)
+
 # ------------------------------------------------------------
 # 🌍 Language Selection (persistent)
 # ------------------------------------------------------------
@@ -110,6 +118,33 @@ with tab1:
         placeholder="Example: What are the rules for annual leave?" if language == "English" else "مثال: ما هي قواعد الإجازة السنوية؟"
     )
 
+    # 🔎 Optional structural filters (explicit "المادة 77" references are looked up directly)
+    filters = None
+    with st.expander("🔎 Filter articles" if language == "English" else "🔎 تصفية المواد"):
+        structure = get_structure()
+        all_label = "All" if language == "English" else "الكل"
+        part = st.selectbox(
+            "Part" if language == "English" else "الباب",
+            [None] + list(structure["parts"]),
+            format_func=lambda n: all_label if n is None else f"{n} — {structure['parts'][n]}",
+        )
+        chapter_titles = structure["chapters"].get(part, {}) if part is not None else {}
+        chapter = st.selectbox(
+            "Chapter" if language == "English" else "الفصل",
+            [None] + list(chapter_titles),
+            format_func=lambda n: all_label if n is None else f"{n} — {chapter_titles[n]}",
+            disabled=not chapter_titles,
+        )
+        lo, hi = structure["articles"]
+        articles = st.slider("Articles" if language == "English" else "المواد", lo, hi, (lo, hi))
+        english_only = st.checkbox("Only articles with an English translation" if language == "English" else "المواد المترجمة فقط")
+        filters = ArticleFilter(
+            part=part,
+            chapter=chapter,
+            article=articles if articles != (lo, hi) else None,
+            english=True if english_only else None,
+        ) or None
+
     employee_data = None
     if use_employee_data:
         with st.expander("🧾 Enter Employee Information" if language == "English" else "🧾 أدخل بيانات الموظف"):
@@ -137,8 +172,12 @@ with tab1:
         if not user_input.strip():
             st.warning("Please enter a question." if language == "English" else "يرجى إدخال السؤال.")
         else:
-            with st.spinner("Searching legal articles..." if language == "English" else "جاري البحث في النظام..."):
-                answer, refs = answer_policy_question(user_input,employee_data,api_key=st.session_state.openai_api_key)
+            try:
+                with st.spinner("Searching legal articles..." if language == "English" else "جاري البحث في النظام..."):
+                    answer, refs = answer_policy_question(user_input,employee_data,api_key=st.session_state.openai_api_key, debug=profile_query, filters=filters)
+            except ValueError as e:  # missing or rejected API key
+                st.error(str(e))
+                st.stop()
 
             st.markdown("### 🧠 Answer:" if language == "English" else "### 🧠 الإجابة:")
             st.markdown(answer)
@@ -158,3 +197,21 @@ with tab1:
                         if r["english_content"]:
                             st.markdown("**English Translation:**")
                             st.write(r["english_content"])
+
+# ------------------------------------------------------------
+# 🐢 Slow Questions (admin, only when ADMIN_PASSWORD is set)
+# ------------------------------------------------------------
+if os.getenv("ADMIN_PASSWORD"):
+    with st.sidebar.expander("🐢 Slow questions (admin)"):
+        if st.text_input("Admin password", type="password") == os.getenv("ADMIN_PASSWORD"):
+            st.caption(f"Slower than PROFILE_SLOW_MS ({PROFILE_SLOW_MS or 'off'} ms) or profiled on request.")
+            profiles = recent_profiles(20)
+            if not profiles:
+                st.info("No profiles recorded yet.")
+            for p in profiles:
+                st.markdown(f"**{p['total_ms']:.0f} ms** · {p['trigger']} · {p['query'][:60]}")
+                st.table([{"stage": s["stage"], "ms": s["ms"]} for s in p["stages"]])
+                hot = hot_functions(p, 3)
+                if hot:
+                    st.caption("🔥 " + " | ".join(f"{h['function']} ({h['share']:.0%})" for h in hot))
+                st.caption(" · ".join(p["files"].values()))
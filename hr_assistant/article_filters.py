@@ -0,0 +1,113 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from qdrant_client import models
+from data_ingestion import ENGLISH_FLAG
+
+# Structural filters over the labor law (part / chapter / article ranges,
+# English translation available) and detection of explicit article references
+# ("المادة 77", "المادة (77) مكرر", "المادة السابعة والسبعون", "Article 77").
+
+Range = Union[int, Tuple[int, int], None]
+
+ARABIC_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹", "01234567890123456789")
+BIS = "مكرر"
+DIGIT_REF_RE = re.compile(
+    r"(?:ال)?مادة\s*[(\[]?\s*([0-9٠-٩۰-۹]+)\s*[)\]]?(\s*" + BIS + r")?"
+    r"|\barticle\s*[(\[]?\s*(\d+)\s*[)\]]?(\s*bis\b)?",
+    re.IGNORECASE,
+)
+WORD_REF_RE = re.compile(r"(?:ال)?مادة\s+((?:[^\s\d،,.؟?!:()]+\s*){1,7})")
+
+
+def _range(value: Range) -> Optional[Tuple[int, int]]:
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return (value, value)
+    lo, hi = value
+    return (int(lo), int(hi))
+
+
+class ArticleFilter:
+    """
+    Structural filter; every field is optional (None = any).
+    part / chapter / article: inclusive (lo, hi) range, or one number.
+    english: True = only articles with an English translation (False = only without).
+    """
+    __slots__ = ("part", "chapter", "article", "english")
+
+    FIELDS = {"part": "part_number", "chapter": "chapter_number", "article": "article_number"}
+
+    def __init__(self, part: Range = None, chapter: Range = None, article: Range = None, english: Optional[bool] = None):
+        self.part = _range(part)
+        self.chapter = _range(chapter)
+        self.article = _range(article)
+        self.english = english
+
+    def ranges(self) -> Iterator[Tuple[str, Tuple[int, int]]]:
+        """(payload field, (lo, hi)) for every range that is set."""
+        for attr, field in self.FIELDS.items():
+            r = getattr(self, attr)
+            if r is not None:
+                yield field, r
+
+    def key(self) -> Tuple:
+        return (self.part, self.chapter, self.article, self.english)
+
+    def __bool__(self) -> bool:
+        return any(v is not None for v in self.key())
+
+    def __repr__(self) -> str:
+        set_fields = ", ".join(f"{a}={getattr(self, a)!r}" for a in self.__slots__ if getattr(self, a) is not None)
+        return f"ArticleFilter({set_fields})"
+
+    def to_qdrant(self) -> Optional[models.Filter]:
+        """Same filter on the Qdrant payload indexes (see data_ingestion.create_collection)."""
+        must = [models.FieldCondition(key=field, range=models.Range(gte=lo, lte=hi)) for field, (lo, hi) in self.ranges()]
+        if self.english is not None:
+            must.append(models.FieldCondition(key=ENGLISH_FLAG, match=models.MatchValue(value=self.english)))
+        return models.Filter(must=must) if must else None
+
+
+# ---------- Explicit article references ----------
+ArticleRef = Tuple[int, bool]  # (article_number, is "مكرر")
+
+
+def reference_table(rows: Iterable[Tuple[int, Optional[int], Optional[str]]]) -> Tuple[Dict[str, ArticleRef], Dict[ArticleRef, List[int]]]:
+    """
+    From (position, article_number, number_ar) rows build
+      names:     number_ar ("السابعة والسبعون", "الحادية عشرة مكرر") -> reference
+      positions: reference -> article positions
+    """
+    names: Dict[str, ArticleRef] = {}
+    positions: Dict[ArticleRef, List[int]] = {}
+    for pos, number, name in rows:
+        if number is None:
+            continue
+        ref = (int(number), BIS in (name or ""))
+        positions.setdefault(ref, []).append(pos)
+        if name:
+            names[" ".join(name.split())] = ref
+    return names, positions
+
+
+def find_article_refs(query: str, names: Dict[str, ArticleRef]) -> List[ArticleRef]:
+    """Article references in the query, in order of appearance, without duplicates."""
+    found: List[Tuple[int, ArticleRef]] = []
+    for m in DIGIT_REF_RE.finditer(query):
+        digits, bis = (m.group(1), m.group(2)) if m.group(1) else (m.group(3), m.group(4))
+        found.append((m.start(), (int(digits.translate(ARABIC_DIGITS)), bool(bis))))
+    for m in WORD_REF_RE.finditer(query):
+        words = m.group(1).split()
+        # longest run of words that names an article ("التاسعة والسبعون مكرر" before "التاسعة والسبعون")
+        for n in range(len(words), 0, -1):
+            ref = names.get(" ".join(words[:n]))
+            if ref is not None:
+                found.append((m.start(), ref))
+                break
+    refs: List[ArticleRef] = []
+    for _, ref in sorted(found, key=lambda x: x[0]):
+        if ref not in refs:
+            refs.append(ref)
+    return refs
@@ -0,0 +1,134 @@
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# TextColumn / BM25Columns are shared with the customer-support app (repo-level rag_engine package)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from rag_engine.columns import TextColumn, BM25Columns
+
+# Columnar, read-only store for the parsed labor-law articles.
+# Every field of labor_law_parsed.json becomes one column (integers in an int64
+# array, strings packed in one UTF-8 buffer + offsets) and BM25 is kept as term
+# postings arrays (rag_engine/columns.py), instead of a list of 249 dicts and
+# one BM25 dict per article.
+# Articles are addressed by position; a dict is only rebuilt for the final top-K.
+
+FACET_FIELDS = ("part_number", "chapter_number", "article_number")
+
+
+class FacetBitmaps:
+    """
+    Precomputed doc bitmaps (np.packbits, one bit per article) for every value of
+    the structural facets, plus one for "has an English translation". A filter
+    ORs the bitmaps of the values in each range, ANDs the facets, and is
+    unpacked once into a boolean mask over positions.
+    """
+    __slots__ = ("n", "values", "english")
+
+    def __init__(self, n: int, values: Dict[str, Dict[int, np.ndarray]], english: np.ndarray):
+        self.n = n
+        self.values = values
+        self.english = english
+
+    @classmethod
+    def build(cls, store: "ArticleStore") -> "FacetBitmaps":
+        n = len(store)
+        values: Dict[str, Dict[int, np.ndarray]] = {}
+        for f in FACET_FIELDS:
+            if f not in store._ints:
+                continue
+            col, present = store._ints[f], ~store._nulls[f]
+            values[f] = {int(v): np.packbits((col == v) & present) for v in np.unique(col[present])}
+        if "english_content" in store._texts:
+            english = (np.diff(store._texts["english_content"].offsets) > 0) & ~store._nulls["english_content"]
+        else:
+            english = np.zeros(n, dtype=bool)
+        return cls(n, values, np.packbits(english))
+
+    def mask(self, ranges: Iterable[Tuple[str, Tuple[int, int]]], english: Optional[bool] = None) -> np.ndarray:
+        """Boolean mask of the articles whose facets fall in every (field, (lo, hi)) range."""
+        bits = np.packbits(np.ones(self.n, dtype=bool))
+        for field, (lo, hi) in ranges:
+            facet = np.zeros_like(bits)
+            for v, value_bits in self.values.get(field, {}).items():
+                if lo <= v <= hi:
+                    facet |= value_bits
+            bits &= facet
+        if english is not None:
+            bits &= self.english if english else ~self.english
+        return np.unpackbits(bits, count=self.n).astype(bool)
+
+
+class ArticleRow:
+    """View of one article; fields are read from the columns on access."""
+    __slots__ = ("_store", "pos")
+
+    def __init__(self, store: "ArticleStore", pos: int):
+        self._store = store
+        self.pos = pos
+
+    def __getitem__(self, field: str):
+        return self._store.value(field, self.pos)
+
+    def get(self, field: str, default=None):
+        return self._store.value(field, self.pos) if field in self._store.fields else default
+
+    @property
+    def content(self) -> str:
+        return self._store.value("arabic_content", self.pos)
+
+    def to_dict(self) -> Dict:
+        return {f: self._store.value(f, self.pos) for f in self._store.fields}
+
+
+class ArticleStore:
+    """
+    Read-only columnar copy of the parsed articles (one column per JSON field,
+    None kept via a null mask), a BM25 index over `arabic_content` and facet
+    bitmaps for structural filters.
+    """
+    __slots__ = ("fields", "_ints", "_texts", "_nulls", "bm25", "facets")
+
+    def __init__(self, fields: List[str], ints: Dict[str, np.ndarray], texts: Dict[str, TextColumn],
+                 nulls: Dict[str, np.ndarray], bm25: BM25Columns):
+        self.fields = fields
+        self._ints = ints
+        self._texts = texts
+        self._nulls = nulls
+        self.bm25 = bm25
+        self.facets = FacetBitmaps.build(self)
+
+    @classmethod
+    def from_articles(cls, articles: List[Dict], tokenize=str.split) -> "ArticleStore":
+        fields: List[str] = []
+        for a in articles:
+            fields.extend(k for k in a if k not in fields)
+        ints, texts, nulls = {}, {}, {}
+        for f in fields:
+            values = [a.get(f) for a in articles]
+            nulls[f] = np.array([v is None for v in values], dtype=bool)
+            if all(v is None or (isinstance(v, int) and not isinstance(v, bool)) for v in values):
+                ints[f] = np.array([v if v is not None else 0 for v in values], dtype=np.int64)
+            else:
+                texts[f] = TextColumn.from_strings("" if v is None else str(v) for v in values)
+        bm25 = BM25Columns.build([tokenize(a.get("arabic_content", "")) for a in articles])
+        return cls(fields, ints, texts, nulls, bm25)
+
+    def __len__(self) -> int:
+        return len(self.bm25.norm)
+
+    def column(self, field: str) -> np.ndarray:
+        """Integer column (e.g. part_number) for vectorized filtering."""
+        return self._ints[field]
+
+    def value(self, field: str, pos: int):
+        if self._nulls[field][pos]:
+            return None
+        if field in self._ints:
+            return int(self._ints[field][pos])
+        return self._texts[field][pos]
+
+    def row(self, pos: int) -> ArticleRow:
+        return ArticleRow(self, pos)
@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+import pandas as pd
+
+import hybird_search as hs
+from hybird_search import HybridRetriever, dense_search, RETRIEVAL_CONFIG
+from article_store import ArticleStore
+from data_ingestion import JSON_PATH
+from rag_engine.tuning import LATENCY_COLUMNS, configurations, pareto_front, choose, save_params
+
+# Sweep the hybrid retrieval knobs (DENSE_TOP_K, ALPHA) over the ground truth,
+# report the quality / latency Pareto frontier and write the chosen
+# configuration to RETRIEVAL_CONFIG (loaded by hybird_search at import).
+#
+#   python autotune.py --limit 500 --max-latency-ms 60
+#
+# TOP_K is not swept: hit rate and MRR are measured @TOP_K, so configurations
+# returning 3 or 8 articles would not be compared on the same k.
+
+GROUND_TRUTH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ground-truth-data.csv")
+GRID = {
+    "DENSE_TOP_K": [3, 5, 10, 20],
+    "ALPHA": [0.3, 0.4, 0.5, 0.6, 0.7, 0.8],
+}
+
+
+# ---------- Metrics (as in search_evaluation.ipynb) ----------
+def hit_rate_at_k(expected, results):
+    return int(expected in [r["index"] for r in results])
+
+
+def mrr_at_k(expected, results):
+    for rank, r in enumerate(results, 1):
+        if r["index"] == expected:
+            return 1.0 / rank
+    return 0.0
+
+
+def evaluate_config(params, df, documents):
+    """Hit rate / MRR @TOP_K (the app's, for every configuration) and end-to-end
+    latency of one configuration (the answer cache is not involved)."""
+    dense_top_k = params["DENSE_TOP_K"]
+    retriever = HybridRetriever(
+        documents,
+        alpha=params["ALPHA"],
+        dense_search=lambda q, query_filter=None: dense_search(q, top_k=dense_top_k, query_filter=query_filter),
+    )
+    hs.embed_query.cache_clear()  # every configuration pays for its own query embeddings
+    hits, mrrs, latencies = [], [], []
+    for question, index in zip(df["question"], df["index"]):
+        start = time.perf_counter()
+        results = retriever.retrieve(str(question), top_k=hs.TOP_K)
+        latencies.append((time.perf_counter() - start) * 1000)
+        expected = int(index) - 1  # ground truth `index` is 1-based, results carry positions
+        hits.append(hit_rate_at_k(expected, results))
+        mrrs.append(mrr_at_k(expected, results))
+    latencies = pd.Series(latencies)
+    return {
+        **params,
+        "hit_rate": sum(hits) / len(hits),
+        "mrr": sum(mrrs) / len(mrrs),
+        "avg_latency_ms": latencies.mean(),
+        "p95_latency_ms": latencies.quantile(0.95),
+    }
+
+
+def autotune(csv_path=GROUND_TRUTH_PATH, grid=GRID, limit=500, seed=42):
+    """One row per configuration: knobs, hit_rate, mrr, avg/p95 latency."""
+    documents = ArticleStore.from_articles(json.load(open(JSON_PATH, encoding="utf-8")))
+    df = pd.read_csv(csv_path)
+    if limit and limit < len(df):
+        df = df.sample(n=limit, random_state=seed)
+
+    # load the embedding model before anything is timed
+    hs.embed_query(str(df["question"].iloc[0]))
+
+    configs = configurations(grid)
+    rows = []
+    for n, params in enumerate(configs, 1):
+        rows.append(evaluate_config(params, df, documents))
+        print(f"[{n}/{len(configs)}] {params} mrr={rows[-1]['mrr']:.3f} p95={rows[-1]['p95_latency_ms']:.1f} ms")
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the hybrid retrieval knobs on the ground-truth set.")
+    parser.add_argument("--csv", default=GROUND_TRUTH_PATH)
+    parser.add_argument("--limit", type=int, default=500, help="questions sampled from the ground truth (0 = all)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dense-top-k", dest="DENSE_TOP_K", type=int, nargs="+", default=GRID["DENSE_TOP_K"])
+    parser.add_argument("--alpha", dest="ALPHA", type=float, nargs="+", default=GRID["ALPHA"])
+    parser.add_argument("--objective", choices=["mrr", "hit_rate"], default="mrr")
+    parser.add_argument("--latency", choices=LATENCY_COLUMNS, default="p95_latency_ms")
+    parser.add_argument("--max-latency-ms", type=float, default=None, help="latency budget for the chosen configuration")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="quality given up for a faster configuration")
+    parser.add_argument("--output", default=RETRIEVAL_CONFIG)
+    parser.add_argument("--report", default=None, help="also write every configuration to this CSV")
+    parser.add_argument("--dry-run", action="store_true", help="report only, do not write the config")
+    args = parser.parse_args()
+
+    if hs.SERVER_HYBRID:
+        # QDRANT_HYBRID=true fuses inside Qdrant (DBSF); ALPHA and DENSE_TOP_K do not apply there
+        raise SystemExit("autotune.py tunes the in-process HybridRetriever; run it without QDRANT_HYBRID=true.")
+
+    results = autotune(args.csv, {k: getattr(args, k) for k in GRID}, args.limit, args.seed)
+    if args.report:
+        results.to_csv(args.report, index=False)
+    front = pareto_front(results, args.objective, args.latency)
+    chosen = choose(front, args.objective, args.latency, args.max_latency_ms, args.tolerance)
+
+    print("\nAll configurations:")
+    print(results.sort_values(args.objective, ascending=False).to_string(index=False))
+    print(f"\nPareto frontier ({args.objective} vs {args.latency}):")
+    print(front.to_string(index=False))
+    params = {"DENSE_TOP_K": int(chosen["DENSE_TOP_K"]), "ALPHA": float(chosen["ALPHA"])}
+    print(f"\nChosen: {params}  {args.objective}={chosen[args.objective]:.3f}  {args.latency}={chosen[args.latency]:.1f}")
+
+    if not args.dry_run:
+        save_params(
+            params,
+            args.output,
+            metrics={m: float(chosen[m]) for m in ("hit_rate", "mrr", *LATENCY_COLUMNS)},
+            objective=args.objective,
+            latency=args.latency,
+            max_latency_ms=args.max_latency_ms,
+            ground_truth=args.csv,
+            queries=args.limit or None,
+            tuned_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        print(f"✅ wrote {args.output}")
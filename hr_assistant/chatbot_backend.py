@@ -1,12 +1,33 @@
 import re
 import json
-from openai import OpenAI
-from hybird_search import HybridRetriever
+import hashlib
+from functools import lru_cache
+from openai import OpenAI, AuthenticationError
+from hybird_search import HybridRetriever, ServerHybridRetriever, SERVER_HYBRID, COLLECTION, TOP_K, qdrant, embed_query
+from data_ingestion import JSON_PATH
+from article_store import ArticleStore
+from article_filters import ArticleFilter
+from rag_engine.profiling import profile_request, stage
+from rag_engine.result_cache import RESULT_CACHE, get_cache
+from rag_engine.versioning import collection_version
+
+ARTICLES_PATH = JSON_PATH
+MAX_CHECKED_KEYS = 10_000
 
 
 # ---------- Prepare ----------
-documents = json.load(open("data/labor_law/labor_law_parsed.json", encoding="utf-8"))
-hybrid = HybridRetriever(documents)
+if SERVER_HYBRID:
+    # BM25 lives in Qdrant as sparse vectors; nothing corpus-sized in process
+    hybrid = ServerHybridRetriever()
+    corpus_hash = None
+else:
+    # parsed JSON is packed into columns once; the list of dicts is not kept.
+    # Its hash is taken from the same read: the columns never change afterwards.
+    with open(ARTICLES_PATH, "rb") as f:
+        raw = f.read()
+    corpus_hash = hashlib.sha256(raw).hexdigest()
+    documents = ArticleStore.from_articles(json.loads(raw.decode("utf-8")))
+    hybrid = HybridRetriever(documents)
 
 
 # ---------- Utilities ----------
@@ -26,6 +47,60 @@ def get_retriever():
     return hybrid
 
 
+@lru_cache(maxsize=1)
+def get_structure():
+    """Parts, chapters and article-number bounds for the filter widgets (read once from Qdrant)."""
+    points, _ = qdrant.scroll(
+        collection_name=COLLECTION,
+        limit=10_000,
+        with_payload=["part_number", "part_title_ar", "chapter_number", "chapter_title_ar", "article_number"],
+        with_vectors=False,
+    )
+    parts, chapters, numbers = {}, {}, []
+    for p in points:
+        pl = p.payload
+        if pl.get("part_number") is not None:
+            parts.setdefault(pl["part_number"], set()).add(pl.get("part_title_ar") or "")
+            if pl.get("chapter_number") is not None:
+                chapters.setdefault(pl["part_number"], {}).setdefault(pl["chapter_number"], set()).add(pl.get("chapter_title_ar") or "")
+        if pl.get("article_number") is not None:
+            numbers.append(pl["article_number"])
+    return {
+        "parts": {n: " / ".join(sorted(t)) for n, t in sorted(parts.items())},
+        "chapters": {pn: {n: " / ".join(sorted(t)) for n, t in sorted(cs.items())} for pn, cs in chapters.items()},
+        "articles": (min(numbers), max(numbers)) if numbers else (1, 1),
+    }
+
+
+def index_version() -> str:
+    """What cached answers depend on: the content hash stored with the Qdrant
+    collection at ingest and the articles loaded in process (hashed once at load)."""
+    return f"{COLLECTION}:{collection_version(qdrant, COLLECTION)}:{corpus_hash or '-'}"
+
+
+# ---------- API Keys ----------
+# sha256 of the keys OpenAI accepted (the keys themselves are not kept)
+_accepted_keys: set = set()
+
+
+def check_api_key(api_key: str | None) -> None:
+    """Raise ValueError unless OpenAI accepts the key; checked once per key and process.
+    Cached answers are shared between users, so they are only served to valid keys."""
+    if not api_key:
+        raise ValueError("OpenAI API key is required for this session.")
+    digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    if digest in _accepted_keys:
+        return
+    with stage("check_key"):
+        try:
+            OpenAI(api_key=api_key).models.list()
+        except AuthenticationError as e:
+            raise ValueError("The OpenAI API key was rejected / تم رفض مفتاح OpenAI.") from e
+    if len(_accepted_keys) >= MAX_CHECKED_KEYS:
+        _accepted_keys.clear()
+    _accepted_keys.add(digest)
+
+
 # ---------- Core Answer ----------
 def generate_answer(query: str, context: str, lang: str, api_key: str) -> str:
     """Generate an answer using a per-user OpenAI API key."""
@@ -52,30 +127,92 @@ Question: {query}
 
 Answer:"""
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-    )
+    with stage("llm"):
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+        )
     answer = response.choices[0].message.content.strip()
     return highlight_articles(answer)
 
 
+# ---------- Retrieval ----------
+def find_articles(query: str, filters: ArticleFilter | None = None, top_k: int = TOP_K, search_query: str | None = None):
+    """Articles referenced in `query` ("المادة 77") that pass `filters`, else a
+    hybrid search for `search_query` (default: the query itself) restricted to `filters`."""
+    retriever = get_retriever()
+    with stage("lookup"):
+        results = retriever.direct_lookup(query, filters)
+    return results or retriever.retrieve(search_query or query, top_k=top_k, filters=filters)
+
+
+def search_articles(query: str, top_k: int = TOP_K, filters: ArticleFilter | None = None, debug: bool = False):
+    """Retrieval only (no LLM, no API key), e.g. for the MCP server; results
+    go through the "search:<top_k>" cache, versioned like the answers."""
+    with profile_request(query, "search", debug):
+        if not RESULT_CACHE or debug:
+            return find_articles(query, filters, top_k)[:top_k]
+        key = query + repr(filters.key()) if filters else query
+        embed = embed_query if not filters and not get_retriever().article_refs(query) else None
+        cache = get_cache(f"search:{top_k}")
+        with stage("cache"):
+            cache.sync(index_version)
+            cached, _ = cache.get(key, embed)
+        if cached is not None:
+            return cached
+        results = find_articles(query, filters, top_k)[:top_k]
+        cache.put(key, results, embed)
+        return results
+
+
 # ---------- Main Entry ----------
-def answer_policy_question(query: str, employee_data: dict | None = None, api_key: str | None = None):
-    """Answer a policy question, optionally using employee data and user-provided key."""
+def answer_policy_question(query: str, employee_data: dict | None = None, api_key: str | None = None, debug: bool = False,
+                           filters: ArticleFilter | None = None):
+    """Answer a policy question, optionally using employee data and user-provided key.
+    `filters` restricts retrieval to a part / chapter / article range (see article_filters.py);
+    explicitly referenced articles ("المادة 77") are looked up directly instead.
+    debug=True (or a request slower than PROFILE_SLOW_MS) saves a profile, see profiling.py."""
     if not api_key:
         raise ValueError("OpenAI API key is required for this session.")
 
-    retriever = get_retriever()
+    with profile_request(query, "answer", debug):
+        if not RESULT_CACHE or debug:  # debug requests measure the whole pipeline
+            return _answer_policy_question(query, employee_data, api_key, filters)
+        # a cache hit makes no OpenAI call, so the key is checked here
+        check_api_key(api_key)
+        # employee data and filters are part of the key; paraphrase (semantic) hits
+        # only for plain questions, "المادة 77" and "المادة 78" embed almost alike.
+        # One cache per answer language: e5 is multilingual, so an English paraphrase
+        # of an Arabic question would otherwise get the Arabic answer.
+        key = query
+        if employee_data:
+            key += json.dumps(employee_data, ensure_ascii=False, sort_keys=True)
+        if filters:
+            key += repr(filters.key())
+        plain = not employee_data and not filters and not get_retriever().article_refs(query)
+        embed = embed_query if plain else None
+        cache = get_cache(f"answer:{detect_language(query)}")
+        with stage("cache"):
+            cache.sync(index_version)
+            cached, _ = cache.get(key, embed)
+        if cached is not None:
+            return cached
+        result = _answer_policy_question(query, employee_data, api_key, filters)
+        cache.put(key, result, embed)
+        return result
+
+
+def _answer_policy_question(query: str, employee_data: dict | None, api_key: str, filters: ArticleFilter | None = None):
     lang = detect_language(query)
 
     # Enrich query with employee info if provided
+    question = query
     if employee_data:
         info = "\n".join([f"{k.replace('_', ' ').title()}: {v}" for k, v in employee_data.items()])
         query += f"\n\nEmployee Info:\n{info}"
 
-    # Retrieve context
-    results = retriever.retrieve(query)
+    # Retrieve context (articles referenced in the question skip retrieval)
+    results = find_articles(question, filters, search_query=query)
     if not results:
         msg = "❌ لم يتم العثور على مواد ذات صلة." if lang == "ar" else "❌ No relevant articles found."
         return msg, []
@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+from qdrant_client import QdrantClient, models
+from tqdm import tqdm
+
+# Shared across the apps: Qdrant client, models, BM25 sparse vectors (repo-level rag_engine package)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from rag_engine.config import QDRANT_HYBRID, DENSE_VECTOR_NAME, SPARSE_VECTOR_NAME
+from rag_engine.resources import get_client, get_embed_model
+from rag_engine.sparse import bm25_doc_vector
+from rag_engine.versioning import content_hash, store_content_hash
+
+
+# ---------- CONFIG ----------
+# QDRANT_URL / QDRANT_PATH (local mode): see rag_engine/config.py
+COLLECTION = "saudi_labor_law"
+# Server-side hybrid: dense + BM25 sparse vectors in one collection, fused in Qdrant
+SERVER_HYBRID = QDRANT_HYBRID
+EMBEDDING_DIM = 768  # multilingual-e5-base (EMBED_MODEL_NAME in rag_engine/config.py)
+# resolved from this file, so the app also loads when imported from another directory
+JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "labor_law", "labor_law_parsed.json")
+UPSERT_BATCH_SIZE = 32
+
+# Compact payload: the Arabic article body is stored once under TEXT_KEY
+# (the key LlamaIndex reads back); everything else is small structural data.
+TEXT_KEY = "text"
+STRUCTURE_FIELDS = [
+    "index", "part_number", "part_title_ar", "chapter_number", "chapter_title_ar",
+    "article_number", "arabic_name", "number_ar", "english_number",
+]
+INTEGER_FIELDS = ["index", "part_number", "chapter_number", "article_number"]
+ENGLISH_FLAG = "has_english"  # bool payload: the article has an English translation
+
+
+# ---------- BM25 Sparse Vectors ----------
+def tokenize(text: str):
+    """Same whitespace tokenization as HybridRetriever's in-process BM25."""
+    return text.split()
+
+
+# ---------- Payload ----------
+def article_payload(article: dict) -> dict:
+    """Build the Qdrant payload for one parsed article."""
+    payload = {k: article.get(k) for k in STRUCTURE_FIELDS}
+    payload[TEXT_KEY] = article.get("arabic_content", "")
+    payload["english_content"] = article.get("english_content", "")
+    payload[ENGLISH_FLAG] = bool(article.get("english_content"))
+    return payload
+
+
+def payload_to_article(payload: dict) -> dict:
+    """Inverse of article_payload(): rebuild the parsed-JSON article shape."""
+    article = {k: v for k, v in payload.items() if k not in (TEXT_KEY, ENGLISH_FLAG)}
+    article["arabic_content"] = payload.get(TEXT_KEY, "")
+    return article
+
+
+# ---------- Collection ----------
+def create_collection(client: QdrantClient, collection: str = COLLECTION, hybrid: bool = SERVER_HYBRID):
+    """(Re)create the collection with payloads on disk and payload indexes for the
+    structural filters (integer ranges + English availability)."""
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    dense_config = models.VectorParams(size=EMBEDDING_DIM, distance=models.Distance.COSINE)
+    if hybrid:
+        client.create_collection(
+            collection_name=collection,
+            vectors_config={DENSE_VECTOR_NAME: dense_config},
+            sparse_vectors_config={SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)},
+            on_disk_payload=True,
+        )
+    else:
+        client.create_collection(collection_name=collection, vectors_config=dense_config, on_disk_payload=True)
+    for field in INTEGER_FIELDS:
+        client.create_payload_index(collection, field_name=field, field_schema=models.PayloadSchemaType.INTEGER)
+    client.create_payload_index(collection, field_name=ENGLISH_FLAG, field_schema=models.PayloadSchemaType.BOOL)
+
+
+def ingest_articles(articles, client: QdrantClient, embed_model, collection: str = COLLECTION, hybrid: bool = SERVER_HYBRID):
+    """Embed the Arabic body of each article and upsert compact points.
+    With hybrid=True each point also gets a BM25 sparse vector."""
+    create_collection(client, collection, hybrid)
+    avgdl = sum(len(tokenize(a.get("arabic_content", ""))) for a in articles) / max(len(articles), 1)
+    for start in tqdm(range(0, len(articles), UPSERT_BATCH_SIZE), desc="Indexing"):
+        batch = articles[start:start + UPSERT_BATCH_SIZE]
+        vectors = embed_model.get_text_embedding_batch([a.get("arabic_content", "") for a in batch])
+        if hybrid:
+            vectors = [
+                {DENSE_VECTOR_NAME: vec, SPARSE_VECTOR_NAME: bm25_doc_vector(tokenize(a.get("arabic_content", "")), avgdl)}
+                for a, vec in zip(batch, vectors)
+            ]
+        client.upsert(
+            collection_name=collection,
+            points=[
+                models.PointStruct(id=start + i, vector=vec, payload=article_payload(a))
+                for i, (a, vec) in enumerate(zip(batch, vectors))
+            ],
+        )
+    store_content_hash(client, collection, content_hash(article_payload(a) for a in articles))
+
+
+if __name__ == "__main__":
+    articles = json.load(open(JSON_PATH, encoding="utf-8"))
+    print(f"🔗 Embedding {len(articles)} articles into '{COLLECTION}'...")
+    ingest_articles(articles, get_client(), get_embed_model())
+    print("✅ Successfully indexed all articles into Qdrant!")
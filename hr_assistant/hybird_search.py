@@ -1,43 +1,69 @@
-from llama_index.vector_stores.qdrant import QdrantVectorStore
-from llama_index.core import Settings, StorageContext, VectorStoreIndex
-from llama_index.core.retrievers import VectorIndexRetriever
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from qdrant_client import QdrantClient
+import os
+from qdrant_client import models
 import numpy as np
-from rank_bm25 import BM25Okapi
-from sklearn.preprocessing import MinMaxScaler
+from article_store import ArticleStore
+from article_filters import reference_table, find_article_refs
+from data_ingestion import (
+    SERVER_HYBRID, DENSE_VECTOR_NAME, SPARSE_VECTOR_NAME,
+    get_client, tokenize, payload_to_article,
+)
+from rag_engine.sparse import bm25_query_vector
+from rag_engine.resources import get_embed_model, embed_query
+from rag_engine.profiling import stage
+from rag_engine.tuning import config_path, load_params
 
 
 # ---------- CONFIG ----------
-QDRANT_URL = "http://localhost:6333"
 COLLECTION = "saudi_labor_law"
-EMBED_MODEL = "intfloat/multilingual-e5-base"
-TOP_K = 5   # number of results to retrieve
-ALPHA = 0.6 # weight for semantic scores in hybrid fusion
+# hand-picked defaults, overridden by the tuned retrieval_config.json (see autotune.py)
+RETRIEVAL_CONFIG = config_path(os.path.dirname(os.path.abspath(__file__)), "HR_RETRIEVAL_CONFIG")
+_knobs = load_params(RETRIEVAL_CONFIG, TOP_K=5, DENSE_TOP_K=3, ALPHA=0.6)
+TOP_K = _knobs["TOP_K"]   # number of results to retrieve
+DENSE_TOP_K = _knobs["DENSE_TOP_K"]  # dense candidates fetched from Qdrant
+ALPHA = _knobs["ALPHA"] # weight for semantic scores in hybrid fusion
 
 
 # ---------- Embedding Model ----------
-embed_model = HuggingFaceEmbedding(model_name=EMBED_MODEL)
-Settings.embed_model = embed_model
+# shared with the other apps; embed_query is memoized there (dense search + semantic cache)
+embed_model = get_embed_model()
 
 # ---------- Qdrant Setup ----------
-qdrant = QdrantClient(url=QDRANT_URL)
-store = QdrantVectorStore(client=qdrant, collection_name=COLLECTION)
-vector_store = QdrantVectorStore(client=qdrant, collection_name=COLLECTION)
-storage_context = StorageContext.from_defaults(vector_store=vector_store)
-
-index = VectorStoreIndex.from_vector_store(
-    vector_store=vector_store,
-    storage_context=storage_context,
-    embed_model=embed_model
-)
+qdrant = get_client()
 
-retriever = VectorIndexRetriever(
-    index=index,
-    vector_store=store,
-    embed_model=embed_model,
-    similarity_top_k=3
-)
+
+def dense_search(query, client=qdrant, collection=COLLECTION, model=embed_model, top_k=DENSE_TOP_K, query_filter=None):
+    """
+    Dense search that only brings back the article position and score;
+    article text is read from the in-memory documents for the final top-K.
+    `query_filter` (a Qdrant Filter) restricts the search to matching articles.
+    Returns list of (doc_position, score).
+    """
+    with stage("embed"):
+        vector = embed_query(query) if model is embed_model else model.get_query_embedding(query)
+    with stage("qdrant_dense"):
+        hits = client.query_points(
+            collection_name=collection,
+            query=vector,
+            using=DENSE_VECTOR_NAME if SERVER_HYBRID else None,
+            query_filter=query_filter,
+            limit=top_k,
+            with_payload=["index"],
+            with_vectors=False,
+        ).points
+    return [(h.payload["index"] - 1, h.score) for h in hits if h.payload.get("index")]
+
+
+def positions_filter(mask):
+    """Qdrant filter for the articles of a boolean position mask (payload `index` = position + 1)."""
+    return models.Filter(must=[
+        models.FieldCondition(key="index", match=models.MatchAny(any=[int(i) + 1 for i in np.flatnonzero(mask)]))
+    ])
+
+
+def minmax(x):
+    """Min-max scale to [0, 1] (all zeros when the scores are flat)."""
+    span = x.max() - x.min() if len(x) else 0
+    return (x - x.min()) / span if span > 0 else np.zeros_like(x)
 
 
 # ---------- Hybrid Retriever ----------
@@ -47,53 +73,172 @@ class HybridRetriever:
     Returns structured results compatible with chat backend.
     """
 
-    def __init__(self, documents, alpha=ALPHA, dense_retriever=retriever):
+    def __init__(self, documents, alpha=ALPHA, dense_search=dense_search):
         """
         Args:
-            documents (list[dict]): Parsed labor law articles with metadata.
+            documents (list[dict] | ArticleStore): Parsed labor law articles with metadata;
+                a list is packed into a columnar ArticleStore once, here.
             alpha (float): Weight for semantic vs lexical scores.
-            dense_retriever: A VectorIndexRetriever instance.
+            dense_search: Callable query -> list of (doc_position, score); called
+                with `query_filter=` (Qdrant Filter) when the retrieval is filtered.
         """
-        self.docs = documents
+        self.docs = documents if isinstance(documents, ArticleStore) else ArticleStore.from_articles(documents)
         self.alpha = alpha
-        self.dense = dense_retriever
-        self.bm25 = BM25Okapi([d["arabic_content"].split() for d in documents])
-
-    def retrieve(self, query, top_k=TOP_K):
+        self.dense = dense_search
+        self.bm25 = self.docs.bm25
+
+        # explicit article references ("المادة 77") -> positions, for direct lookups
+        self.names, self.ref_positions = reference_table(
+            (i, self.docs.value("article_number", i), self.docs.row(i).get("number_ar")) for i in range(len(self.docs))
+        )
+
+    def _result(self, i, score):
+        doc = self.docs.row(int(i)).to_dict()
+        return {
+            "index": int(i),
+            "score": float(score),
+            "content": doc.get("arabic_content", ""),
+            "metadata": doc
+        }
+
+    def article_refs(self, query):
+        """Explicit article references in the query, as (article_number, is_bis)."""
+        return find_article_refs(query, self.names)
+
+    def direct_lookup(self, query, filters=None):
+        """Articles explicitly referenced in the query ("المادة 77"), without retrieval;
+        [] if none. `filters` (ArticleFilter) drops the referenced articles it excludes."""
+        positions = [i for ref in self.article_refs(query) for i in self.ref_positions.get(ref, [])]
+        if positions and filters:
+            mask = self.docs.facets.mask(filters.ranges(), filters.english)
+            positions = [i for i in positions if mask[i]]
+        return [self._result(i, 1.0) for i in positions]
+
+    def retrieve(self, query, top_k=TOP_K, filters=None):
         """
         Perform hybrid retrieval using BM25 and dense similarity.
+        `filters` (ArticleFilter) restricts both stages to the matching articles,
+        via the store's facet bitmaps.
         Returns list of dicts: { index, score, content, metadata }.
         """
+        mask = self.docs.facets.mask(filters.ranges(), filters.english) if filters else None
+        if mask is not None and not mask.any():
+            return []
+
         # ---------- BM25 Retrieval ----------
-        bm25_scores = self.bm25.get_scores(query.split())
-        bm25_scores = MinMaxScaler().fit_transform(bm25_scores.reshape(-1, 1)).flatten()
+        with stage("bm25"):
+            bm25_scores = self.bm25.get_scores(query.split(), mask)
 
         # ---------- Dense Retrieval ----------
-        dense_results = self.dense.retrieve(query)
         dense_scores = np.zeros(len(self.docs))
 
-        for r in dense_results:
-            idx = r.node.metadata.get("index", None)
-            if idx is not None and 0 <= idx < len(self.docs):
-                dense_scores[idx] = r.score
+        hits = self.dense(query) if mask is None else self.dense(query, query_filter=positions_filter(mask))
+        for idx, score in hits:
+            if 0 <= idx < len(self.docs):
+                dense_scores[idx] = score
 
-        dense_scores = MinMaxScaler().fit_transform(dense_scores.reshape(-1, 1)).flatten()
+        # with a filter, only the matching articles are normalized and ranked
+        positions = np.flatnonzero(mask) if mask is not None else None
+        if positions is not None:
+            bm25_scores, dense_scores = bm25_scores[positions], dense_scores[positions]
+        bm25_scores = minmax(bm25_scores)
+        dense_scores = minmax(dense_scores)
 
         # ---------- Hybrid Fusion ----------
-        hybrid_scores = self.alpha * dense_scores + (1 - self.alpha) * bm25_scores
-
-        # ---------- Top-K Selection ----------
-        top_indices = np.argsort(hybrid_scores)[::-1][:top_k]
-
-        # ---------- Build Structured Results ----------
-        results = []
-        for i in top_indices:
-            doc = self.docs[i]
-            results.append({
-                "index": i,
-                "score": float(hybrid_scores[i]),
-                "content": doc.get("arabic_content", ""),
-                "metadata": doc
-            })
-
-        return results
+        with stage("fusion"):
+            hybrid_scores = self.alpha * dense_scores + (1 - self.alpha) * bm25_scores
+
+            # ---------- Top-K Selection ----------
+            top_indices = np.argsort(hybrid_scores)[::-1][:top_k]
+
+        # ---------- Build Structured Results (final top-K only) ----------
+        return [
+            self._result(positions[j] if positions is not None else j, hybrid_scores[j])
+            for j in top_indices
+        ]
+
+
+# ---------- Server-side Hybrid Retriever ----------
+class ServerHybridRetriever:
+    """
+    Stateless hybrid retriever: dense and BM25 sparse prefetch run inside Qdrant
+    and are fused there (DBSF normalizes each score distribution before summing,
+    like the min-max fusion above). Needs a collection built with QDRANT_HYBRID=true.
+    Returns the same structure as HybridRetriever.retrieve.
+    """
+
+    def __init__(self, client=qdrant, collection=COLLECTION, model=embed_model, prefetch_k=20):
+        self.client = client
+        self.collection = collection
+        self.model = model
+        self.prefetch_k = prefetch_k
+        self._refs = None
+
+    def _result(self, payload, score):
+        doc = payload_to_article(payload)
+        return {
+            "index": doc.get("index", 0) - 1,
+            "score": float(score),
+            "content": doc.get("arabic_content", ""),
+            "metadata": doc
+        }
+
+    def reference_table(self):
+        """(names, positions) for article references, read once from the payloads."""
+        if self._refs is None:
+            points, _ = self.client.scroll(
+                collection_name=self.collection,
+                limit=10_000,
+                with_payload=["index", "article_number", "number_ar"],
+                with_vectors=False,
+            )
+            self._refs = reference_table(
+                (p.payload["index"] - 1, p.payload.get("article_number"), p.payload.get("number_ar"))
+                for p in points if p.payload.get("index")
+            )
+        return self._refs
+
+    def article_refs(self, query):
+        """Explicit article references in the query, as (article_number, is_bis)."""
+        return find_article_refs(query, self.reference_table()[0])
+
+    def direct_lookup(self, query, filters=None):
+        """Articles explicitly referenced in the query ("المادة 77"), without retrieval;
+        [] if none. `filters` (ArticleFilter) is added to the lookup inside Qdrant."""
+        ref_positions = self.reference_table()[1]
+        positions = [i for ref in self.article_refs(query) for i in ref_positions.get(ref, [])]
+        if not positions:
+            return []
+        query_filter = filters.to_qdrant() if filters else None
+        points, _ = self.client.scroll(
+            collection_name=self.collection,
+            scroll_filter=models.Filter(must=[
+                models.FieldCondition(key="index", match=models.MatchAny(any=[i + 1 for i in positions])),
+                *(query_filter.must if query_filter else []),
+            ]),
+            limit=len(positions),
+            with_payload=True,
+            with_vectors=False,
+        )
+        by_position = {p.payload["index"] - 1: p.payload for p in points}
+        return [self._result(by_position[i], 1.0) for i in positions if i in by_position]
+
+    def retrieve(self, query, top_k=TOP_K, filters=None):
+        """`filters` (ArticleFilter) is applied inside Qdrant, on the payload indexes."""
+        query_filter = filters.to_qdrant() if filters else None
+        with stage("embed"):
+            vector = embed_query(query) if self.model is embed_model else self.model.get_query_embedding(query)
+        with stage("qdrant_hybrid"):
+            hits = self.client.query_points(
+                collection_name=self.collection,
+                prefetch=[
+                    models.Prefetch(query=vector, using=DENSE_VECTOR_NAME, filter=query_filter, limit=self.prefetch_k),
+                    models.Prefetch(query=bm25_query_vector(tokenize(query)), using=SPARSE_VECTOR_NAME, filter=query_filter, limit=self.prefetch_k),
+                ],
+                query=models.FusionQuery(fusion=models.Fusion.DBSF),
+                limit=top_k,
+                with_payload=True,
+                with_vectors=False,
+            ).points
+
+        return [self._result(h.payload, h.score) for h in hits]
@@ -0,0 +1,369 @@
+"""
+PDF -> structured articles pipeline (same output as process_labor_pdf.ipynb).
+
+    python labor_pdf_pipeline.py data/labor_law/labor_law_ar.pdf    # -> data/labor_law/labor_law_ar_parsed.json
+    python labor_pdf_pipeline.py a.pdf b.pdf --workers 8      # -> a_parsed.json, b_parsed.json
+
+- Pages are extracted in parallel (one process per page range).
+- Extracted pages are cached under CACHE_DIR/<sha256 of the PDF>/, so re-running
+  (or adding another document) only extracts PDFs that were never seen before.
+- Parts (الباب), chapters (الفصل) and articles (المادة) are parsed in one
+  streaming pass over the lines, and articles are written to the JSON file as
+  soon as they are complete.
+- english_content is left empty unless a translate function is passed
+  (the MarianMT step from the notebook), so the CLI refuses to overwrite a
+  JSON that already has translations (e.g. labor_law_parsed.json, which the
+  app serves) unless --force is given.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from rag_engine.columns import file_sha256  # shared with the customer-support corpus store
+
+
+# ---------- CONFIG ----------
+# resolved from this file, like the other data paths
+CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", ".pdf_cache"))
+WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PAGES_PER_TASK = 8
+
+# ---------- Arabic Number Conversion (up to 999) ----------
+UNITS = {
+    "صفر": 0, "واحد": 1, "واحدة": 1, "أول": 1, "الأول": 1, "الأولى": 1, "الحادية" : 1,
+    "اثنان": 2, "اثنين": 2, "إثنان": 2, "الثاني": 2, "الثانية": 2,
+    "ثلاثة": 3, "الثالث": 3, "الثالثة": 3,
+    "أربعة": 4, "الرابع": 4, "الرابعة": 4,
+    "خمسة": 5, "الخامس": 5, "الخامسة": 5,
+    "ستة": 6, "السادس": 6, "السادسة": 6,
+    "سبعة": 7, "السابع": 7, "السابعة": 7,
+    "ثمانية": 8, "الثامن": 8, "الثامنة": 8,
+    "تسعة": 9, "التاسع": 9, "التاسعة": 9,
+    "عشرة": 10, "العاشر": 10, "العاشرة": 10,
+    "إحدى عشرة": 11, "الحادي عشر": 11, "الحادية عشرة": 11,
+    "اثنا عشر": 12, "الثاني عشر": 12, "الثانية عشرة": 12,
+    "ثلاثة عشر": 13, "الثالث عشر": 13,
+    "أربعة عشر": 14, "الرابع عشر": 14,
+    "خمسة عشر": 15, "الخامس عشر": 15,
+    "ستة عشر": 16, "السادس عشر": 16,
+    "سبعة عشر": 17, "السابع عشر": 17,
+    "ثمانية عشر": 18, "الثامن عشر": 18,
+    "تسعة عشر": 19, "التاسع عشر": 19
+}
+
+TENS = {
+    "عشرون": 20, "العشرون": 20,"عشرين": 20, "العشرين": 20,
+    "ثلاثون": 30, "الثلاثون" : 30, "ثلاثين": 30, "الثلاثين" : 30,
+    "أربعون": 40, "الأربعون": 40,"أربعين": 40, "الأربعين": 40,
+    "خمسون": 50,"الخمسون" : 50,"خمسين": 50,"الخمسين" : 50,
+    "ستون": 60, "الستون": 60,"ستين": 60, "الستين": 60,
+    "سبعون": 70, "السبعون": 70,"سبعين": 70, "السبعين": 70,
+    "ثمانون": 80, "الثمانون": 80,"ثمانين": 80, "الثمانين": 80,
+    "تسعون": 90 , "التسعون" : 90,"تسعين": 90 , "التسعين" : 90
+}
+
+HUNDREDS = {
+    "مائة": 100, "المائة": 100,
+    "مائتان": 200, "المائتين": 200,"المئتان":200,
+    "ثلاثمائة": 300, "أربعمائة": 400,
+    "خمسمائة": 500, "ستمائة": 600,
+    "سبعمائة": 700, "ثمانمائة": 800,
+    "تسعمائة": 900
+}
+
+
+def arabic_text_to_number(text: str) -> int:
+    text = text.replace(" و", " ").strip()
+    total = 0
+    if "بعد" in text:
+        left, right = text.split("بعد", 1)
+        return arabic_text_to_number(right.strip()) + arabic_text_to_number(left.strip())
+    for word in text.split():
+        if word in HUNDREDS:
+            total += HUNDREDS[word]
+        elif word in TENS:
+            total += TENS[word]
+        elif word in UNITS:
+            total += UNITS[word]
+    return total
+
+
+# ---------- Page Extraction (parallel + cached) ----------
+def page_text(page, nfkc: bool = False) -> str:
+    """Use PyMuPDF blocks extraction to keep Arabic order stable."""
+    blocks = page.get_text("blocks")
+    blocks.sort(key=lambda b: (b[1], -b[0]))  # sort top-to-bottom, right-to-left
+    text = "\n".join(b[4] for b in blocks)
+    # PDFs written with Arabic presentation forms (ﺍﻟﻤﺎﺩﺓ) need NFKC to match the headers
+    return unicodedata.normalize("NFKC", text) if nfkc else text
+
+
+def _page_path(cache_dir: str, page_no: int) -> str:
+    return os.path.join(cache_dir, f"page_{page_no:04d}.txt")
+
+
+def _extract_pages(pdf_path: str, page_numbers: List[int], cache_dir: str, nfkc: bool) -> List[str]:
+    """Worker: extract a range of pages and write each one to the cache."""
+    texts = []
+    with fitz.open(pdf_path) as doc:
+        for page_no in page_numbers:
+            text = page_text(doc[page_no], nfkc)
+            path = _page_path(cache_dir, page_no)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(path + ".tmp", path)
+            texts.append(text)
+    return texts
+
+
+def iter_pages(pdf_path: str, cache_dir: str = CACHE_DIR, workers: int = WORKERS, nfkc: bool = False) -> Iterator[str]:
+    """
+    Yield page texts in order. Cached pages are read back; missing ones are
+    extracted by a process pool and yielded as soon as their range is done.
+    """
+    key = file_sha256(pdf_path) + ("-nfkc" if nfkc else "")
+    cache_dir = os.path.join(cache_dir, key)
+    os.makedirs(cache_dir, exist_ok=True)
+    with fitz.open(pdf_path) as doc:
+        page_count = doc.page_count
+
+    missing = [p for p in range(page_count) if not os.path.exists(_page_path(cache_dir, p))]
+    if not missing:
+        for p in range(page_count):
+            with open(_page_path(cache_dir, p), encoding="utf-8") as f:
+                yield f.read()
+        return
+
+    ranges = [missing[i:i + PAGES_PER_TASK] for i in range(0, len(missing), PAGES_PER_TASK)]
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(ranges)))) as pool:
+        futures = {r[0]: (r, pool.submit(_extract_pages, pdf_path, r, cache_dir, nfkc)) for r in ranges}
+        extracted: Dict[int, str] = {}
+        for p in range(page_count):
+            if p in futures:
+                pages, future = futures.pop(p)
+                extracted.update(zip(pages, future.result()))
+            if p in extracted:
+                yield extracted.pop(p)
+            else:
+                with open(_page_path(cache_dir, p), encoding="utf-8") as f:
+                    yield f.read()
+
+
+def iter_lines(pages: Iterable[str]) -> Iterator[str]:
+    """Lines of "\\n".join(pages), without building the whole text."""
+    carry = None
+    for page in pages:
+        lines = page.split("\n") if carry is None else (carry + "\n" + page).split("\n")
+        carry = lines.pop()
+        yield from lines
+    if carry is not None:
+        yield carry
+
+
+# ---------- Streaming Structure Parser ----------
+# Same patterns as the notebook: headers may start mid-line and end the line,
+# the title is the next non-empty line; articles start a line with "المادة ...:".
+PART_RE = re.compile(r"(الباب\s+[^\n]{1,30})\s*$")
+CHAPTER_RE = re.compile(r"(الفصل\s+[^\n]{1,30})\s*$")
+ARTICLE_RE = re.compile(r"^\s*المادة\s+([^:\n]{1,80})\s*:\s*(.*)$")
+
+NO_PART = {"part_title_ar": "الجزء العام", "part_number_ar": None, "part_number": None}
+NO_CHAPTER = {"chapter_title_ar": "بدون فصل", "chapter_number_ar": None, "chapter_number": None}
+
+
+class StructureParser:
+    """
+    Line-by-line part/chapter/article parser. Articles are emitted as soon as
+    the next header or article starts. Articles seen before the first chapter
+    of a part (or before the first part) are held back: the notebook drops them
+    when a chapter (part) header follows, and files them under the default
+    "بدون فصل" / "الجزء العام" otherwise.
+    """
+
+    def __init__(self, translate: Optional[Callable[[str], str]] = None):
+        self.translate = translate
+        self.index = 0
+        self.part = None           # None until the first part header
+        self.chapter = None        # None until the first chapter header of the part
+        self.part_title_pending = False
+        self.chapter_title_pending = False
+        self.article = None        # (number_text, [content lines])
+        self.held: List[Tuple[Dict, Optional[Dict]]] = []  # (article, chapter) not emitted yet
+
+    def feed(self, line: str) -> List[Dict]:
+        out: List[Dict] = []
+
+        if self.part_title_pending and line.strip():
+            self.part["part_title_ar"] = line.strip()
+            self.part_title_pending = False
+        else:
+            m = PART_RE.search(line)
+            if m:
+                self._article_line(line[:m.start()])
+                self._close_article(out)
+                self._close_part(out)
+                number = m.group(1).strip().replace("الباب", "").strip()
+                self.part = {"part_title_ar": "", "part_number_ar": number,
+                             "part_number": arabic_text_to_number(number)}
+                self.chapter = None
+                self.part_title_pending = True
+                self.chapter_title_pending = False
+                return out
+
+        if self.chapter_title_pending and line.strip():
+            self.chapter["chapter_title_ar"] = line.strip()
+            self.chapter_title_pending = False
+        else:
+            m = CHAPTER_RE.search(line)
+            if m:
+                self._article_line(line[:m.start()])
+                self._close_article(out)
+                # text before the first chapter is not part of any chapter
+                self.held = [(r, c) for r, c in self.held if c is not None]
+                number = m.group(1).strip().replace("الفصل", "").strip()
+                self.chapter = {"chapter_title_ar": "", "chapter_number_ar": number,
+                                "chapter_number": arabic_text_to_number(number)}
+                self.chapter_title_pending = True
+                return out
+
+        if ARTICLE_RE.match(line):
+            self._close_article(out)
+        self._article_line(line)
+        return out
+
+    def close(self) -> List[Dict]:
+        out: List[Dict] = []
+        self._close_article(out)
+        self._close_part(out, last=True)
+        return out
+
+    def _article_line(self, line: str) -> None:
+        m = ARTICLE_RE.match(line)
+        if m:
+            self.article = (m.group(1).strip(), [m.group(2)])
+        elif self.article is not None:
+            self.article[1].append(line)
+
+    def _close_article(self, out: List[Dict]) -> None:
+        if self.article is None:
+            return
+        number_text, lines = self.article
+        self.article = None
+        record = {
+            "arabic_name": f"المادة {number_text}",
+            "article_number": arabic_text_to_number(number_text),
+            "number_ar": number_text,
+            "arabic_content": "\n".join(lines).strip(),
+        }
+        if self.part is not None and self.chapter is not None:
+            out.append(self._emit(record, self.chapter))
+        else:
+            self.held.append((record, self.chapter))
+
+    def _close_part(self, out: List[Dict], last: bool = False) -> None:
+        # Before the first part header everything is held: it is dropped if a
+        # part follows, and filed under "الجزء العام" if the document has none.
+        if self.part is not None or last:
+            seen_chapter = any(chapter is not None for _, chapter in self.held)
+            for record, chapter in self.held:
+                if chapter is not None or not seen_chapter:
+                    out.append(self._emit(record, chapter or NO_CHAPTER))
+        self.held.clear()
+
+    def _emit(self, article: Dict, chapter: Dict) -> Dict:
+        self.index += 1
+        part = self.part if self.part is not None else NO_PART
+        return {
+            "index": self.index,
+            "part_title_ar": part["part_title_ar"],
+            "part_number_ar": part["part_number_ar"],
+            "part_number": part["part_number"],
+            "chapter_title_ar": chapter["chapter_title_ar"],
+            "chapter_number_ar": chapter["chapter_number_ar"],
+            "chapter_number": chapter["chapter_number"],
+            **article,
+            "english_content": self.translate(article["arabic_content"]) if self.translate else "",
+            "english_number": f"Article {article['article_number']}",
+        }
+
+
+def iter_articles(pdf_path: str, translate: Optional[Callable[[str], str]] = None, **page_kwargs) -> Iterator[Dict]:
+    parser = StructureParser(translate)
+    for line in iter_lines(iter_pages(pdf_path, **page_kwargs)):
+        yield from parser.feed(line)
+    yield from parser.close()
+
+
+# ---------- Incremental JSON Output ----------
+def write_articles(articles: Iterable[Dict], json_path: str) -> int:
+    """
+    Stream articles into json_path (same layout as json.dump(..., indent=2,
+    ensure_ascii=False)). Written to a temp file and renamed when complete.
+    """
+    tmp_path = json_path + ".tmp"
+    count = 0
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for article in articles:
+                f.write("[\n" if count == 0 else ",\n")
+                body = json.dumps(article, ensure_ascii=False, indent=2)
+                f.write("\n".join("  " + line for line in body.split("\n")))
+                count += 1
+            f.write("\n]" if count else "[]")
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, json_path)
+    return count
+
+
+def default_output(pdf_path: str) -> str:
+    return os.path.splitext(pdf_path)[0] + "_parsed.json"
+
+
+def has_translations(json_path: str) -> bool:
+    """True if json_path exists and some article has a non-empty english_content."""
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            articles = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(articles, list) and any(isinstance(a, dict) and a.get("english_content") for a in articles)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse labor-law style PDFs into structured article JSON.")
+    parser.add_argument("pdfs", nargs="+", help="PDF files to parse")
+    parser.add_argument("-o", "--output", help="output JSON (only with a single PDF; default <pdf>_parsed.json)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="extraction processes")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="per-page text cache")
+    parser.add_argument("--nfkc", action="store_true", help="normalize Arabic presentation forms")
+    parser.add_argument("--force", action="store_true", help="overwrite an output that has English translations")
+    args = parser.parse_args(argv)
+    if args.output and len(args.pdfs) > 1:
+        parser.error("--output can only be used with a single PDF")
+
+    out_paths = [args.output or default_output(p) for p in args.pdfs]
+    if not args.force:
+        translated = [p for p in out_paths if has_translations(p)]
+        if translated:
+            # the CLI writes english_content = "": overwriting would drop the translations
+            parser.error(f"{', '.join(translated)} has English translations; pass --force to overwrite it")
+
+    for pdf_path, out_path in zip(args.pdfs, out_paths):
+        articles = iter_articles(pdf_path, cache_dir=args.cache_dir, workers=args.workers, nfkc=args.nfkc)
+        count = write_articles(articles, out_path)
+        print(f"✅ {pdf_path}: {count} articles → {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+from .engine import RetrievalEngine
+from .corpora import get_engine, faq_backend, labor_law_backend
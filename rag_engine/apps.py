@@ -0,0 +1,48 @@
+import os
+import sys
+import importlib
+import threading
+from typing import List
+
+from .config import REPO_ROOT
+
+# The apps are flat directories run from their own folder, with plain top-level
+# module names that clash between them (both have a data_ingestion.py). To use
+# both in one process, each app is imported with its folder first on sys.path
+# and its modules are taken out of sys.modules again afterwards: the returned
+# modules keep working (their imports are already bound), and the next app
+# imports its own data_ingestion instead of finding the previous one.
+
+_lock = threading.Lock()
+
+
+def _local_names(app_path: str) -> List[str]:
+    """Top-level module and package names defined by the app folder."""
+    names = []
+    for entry in os.listdir(app_path):
+        if entry.endswith(".py"):
+            names.append(entry[:-3])
+        elif os.path.isfile(os.path.join(app_path, entry, "__init__.py")):
+            names.append(entry)
+    return names
+
+
+def _is_local(name: str, local: List[str]) -> bool:
+    return name.split(".", 1)[0] in local
+
+
+def load_app(app_dir: str, *modules: str) -> list:
+    """Import `modules` (e.g. "search_process") from the app in REPO_ROOT/app_dir."""
+    app_path = os.path.join(REPO_ROOT, app_dir)
+    local = _local_names(app_path)
+    with _lock:
+        # modules of the same names already loaded (e.g. by the app running this process) step aside
+        saved = {name: sys.modules.pop(name) for name in list(sys.modules) if _is_local(name, local)}
+        sys.path.insert(0, app_path)
+        try:
+            return [importlib.import_module(m) for m in modules]
+        finally:
+            sys.path.remove(app_path)
+            for name in [n for n in sys.modules if _is_local(n, local)]:
+                del sys.modules[name]
+            sys.modules.update(saved)
@@ -0,0 +1,119 @@
+import math
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .sparse import BM25_K1, BM25_B
+
+# Columnar building blocks of the apps' in-process corpora (customer-support
+# CorpusStore, hr_assistant ArticleStore): strings packed in one UTF-8 buffer +
+# offsets, and BM25 as term postings arrays, instead of one Python object (and
+# dict) per document. Everything is addressed by integer position.
+
+BM25_EPSILON = 0.25
+
+
+class TextColumn:
+    """Strings packed in one UTF-8 byte buffer; column[i] decodes one string."""
+    __slots__ = ("buffer", "offsets")
+
+    def __init__(self, buffer: np.ndarray, offsets: np.ndarray):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "TextColumn":
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+
+class BM25Columns:
+    """
+    BM25Okapi (rank_bm25 defaults, same scores) over term postings arrays:
+    sorted vocabulary, per-term idf, and CSC-style (doc, tf) postings.
+    """
+    __slots__ = ("terms", "idf", "indptr", "post_docs", "post_tf", "norm", "k1")
+
+    def __init__(self, terms, idf, indptr, post_docs, post_tf, norm, k1=BM25_K1):
+        self.terms = terms
+        self.idf = idf
+        self.indptr = indptr
+        self.post_docs = post_docs
+        self.post_tf = post_tf
+        self.norm = norm
+        self.k1 = k1
+
+    @classmethod
+    def build(cls, tokenized: List[List[str]], k1: float = BM25_K1, b: float = BM25_B, epsilon: float = BM25_EPSILON) -> "BM25Columns":
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_len = np.zeros(len(tokenized), dtype=np.float64)
+        for d, tokens in enumerate(tokenized):
+            doc_len[d] = len(tokens)
+            tf: Dict[str, int] = {}
+            for t in tokens:
+                tf[t] = tf.get(t, 0) + 1
+            for t, n in tf.items():
+                postings.setdefault(t, []).append((d, n))
+
+        # idf exactly as rank_bm25: summed in first-seen order, negatives -> epsilon * mean
+        n_docs = len(tokenized)
+        idf_by_term = {t: math.log(n_docs - len(p) + 0.5) - math.log(len(p) + 0.5) for t, p in postings.items()}
+        average_idf = sum(idf_by_term.values()) / max(len(idf_by_term), 1)
+        for t, v in idf_by_term.items():
+            if v < 0:
+                idf_by_term[t] = epsilon * average_idf
+
+        terms = np.array(sorted(postings), dtype=np.str_)
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(postings[t]) for t in terms], out=indptr[1:])
+        pairs = [pair for t in terms for pair in postings[t]]
+        post_docs = np.array([d for d, _ in pairs], dtype=np.int32)
+        post_tf = np.array([n for _, n in pairs], dtype=np.float64)
+        avgdl = doc_len.sum() / n_docs if n_docs else 1.0
+        norm = k1 * (1 - b + b * doc_len / avgdl)
+        idf = np.array([idf_by_term[t] for t in terms], dtype=np.float64)
+        return cls(terms, idf, indptr, post_docs, post_tf, norm, k1)
+
+    def term_index(self, token: str) -> Optional[int]:
+        j = int(np.searchsorted(self.terms, token))
+        return j if j < len(self.terms) and self.terms[j] == token else None
+
+    def get_scores(self, tokens: List[str], mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Scores for every document; with a boolean `mask`, postings of documents
+        outside it are skipped (their score stays 0)."""
+        scores = np.zeros(len(self.norm), dtype=np.float64)
+        for t in tokens:
+            j = self.term_index(t)
+            if j is None:
+                continue
+            lo, hi = self.indptr[j], self.indptr[j + 1]
+            docs, tf = self.post_docs[lo:hi], self.post_tf[lo:hi]
+            if mask is not None:
+                keep = mask[docs]
+                docs, tf = docs[keep], tf[keep]
+            scores[docs] += self.idf[j] * (tf * (self.k1 + 1) / (tf + self.norm[docs]))
+        return scores
+
+    def top_k(self, tokens: List[str], k: int) -> List[Tuple[int, float]]:
+        """(position, score) of the k best documents, best first."""
+        scores = self.get_scores(tokens)
+        # stable: equal scores keep corpus order, like sorted(..., reverse=True)
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
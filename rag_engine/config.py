@@ -0,0 +1,22 @@
+import os
+
+# =========================
+# SHARED CONFIG
+# =========================
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+QDRANT_PATH = os.getenv("QDRANT_PATH")  # set to use Qdrant local mode (no server)
+QDRANT_HYBRID = os.getenv("QDRANT_HYBRID", "false").lower() == "true"
+
+EMBED_MODEL_NAME = "intfloat/multilingual-e5-base"
+RERANK_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# Same names the ingestion scripts use for hybrid collections
+TEXT_KEY = "text"
+DENSE_VECTOR_NAME = "text-dense"
+SPARSE_VECTOR_NAME = "bm25"
+
+# Fan-out across corpora
+FANOUT_WORKERS = int(os.getenv("RAG_FANOUT_WORKERS", "4"))
+RRF_K = 60
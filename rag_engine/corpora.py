@@ -0,0 +1,53 @@
+import threading
+from typing import Dict, List, Optional
+
+from .apps import load_app
+from .engine import RetrievalEngine, SearchFn
+
+# The corpora are the apps' own search pipelines (cascade, columnar store,
+# result cache, filters, tuned knobs), not re-implementations of them.
+
+
+# ---------- Customer-support FAQs (customer-support/search_process.py) ----------
+def faq_backend() -> SearchFn:
+    sp, = load_app("customer-support", "search_process")
+    prepared = sp.prepare_search()
+
+    def search(query: str, top_k: Optional[int] = None) -> List[Dict]:
+        # doc_id, question, answer, score; the pipeline returns at most FINAL_TOP_N rows
+        rows = sp.query_without_llm(prepared["index"], prepared["bm25"], prepared["corpus_items"], query)
+        return rows[:top_k or sp.FINAL_TOP_N]
+
+    return search
+
+
+# ---------- Saudi labor law (hr_assistant/chatbot_backend.py) ----------
+def labor_law_backend() -> SearchFn:
+    cb, af = load_app("hr_assistant", "chatbot_backend", "article_filters")
+
+    def search(query: str, top_k: Optional[int] = None, part=None, chapter=None, article=None,
+               english: Optional[bool] = None) -> List[Dict]:
+        # index, score, content, metadata (as HybridRetriever.retrieve); part / chapter /
+        # article are a number or an inclusive (lo, hi) range, as in ArticleFilter
+        filters = af.ArticleFilter(part, chapter, article, english)
+        return cb.search_articles(query, top_k or cb.TOP_K, filters or None)
+
+    return search
+
+
+DEFAULT_CORPORA = {"faq": faq_backend, "labor_law": labor_law_backend}
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> RetrievalEngine:
+    """Process-wide engine with the default corpora registered (loaded on first use)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            engine = RetrievalEngine()
+            for name, load in DEFAULT_CORPORA.items():
+                engine.register(name, load)
+            _engine = engine
+        return _engine
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .config import FANOUT_WORKERS, RRF_K
+from .resources import embed_query
+
+# A corpus backend answers (query, top_k, **options) with the app's own result rows
+SearchFn = Callable[..., List[Dict]]
+
+
+class RetrievalEngine:
+    """
+    Routes queries to the assistants' own search pipelines (registered by name,
+    loaded on first use). The apps share one embedder, cross-encoder and Qdrant
+    client through rag_engine.resources, so loading a second app adds its corpus,
+    not another copy of the models. search_many fans a query out to several
+    corpora (embedding it only once) and merges the results.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], SearchFn]] = {}
+        self._backends: Dict[str, SearchFn] = {}
+        self._lock = threading.Lock()
+
+    # ---------- Registration ----------
+    def register(self, name: str, load: Callable[[], SearchFn]) -> None:
+        """Register a corpus; `load()` builds its search function the first time it is needed."""
+        self._loaders[name] = load
+        self._backends.pop(name, None)
+
+    @property
+    def corpora(self) -> List[str]:
+        return list(self._loaders)
+
+    def backend(self, name: str) -> SearchFn:
+        if name not in self._loaders:
+            raise KeyError(f"Unknown corpus '{name}'. Registered: {', '.join(self._loaders) or 'none'}")
+        with self._lock:
+            if name not in self._backends:
+                self._backends[name] = self._loaders[name]()
+            return self._backends[name]
+
+    def warm_up(self, query: str = "warm up") -> None:
+        """Load every corpus and run one query through it, so the first real
+        request does not pay for model loading or first-call setup."""
+        for name in self.corpora:
+            self.backend(name)(query, None)
+
+    # ---------- Search ----------
+    def search(self, corpus: str, query: str, top_k: Optional[int] = None, **options) -> List[Dict]:
+        """Search one corpus with its app's pipeline. Result rows use the corpus' own
+        format; `options` are backend specific (e.g. labor-law `filters`)."""
+        return self.backend(corpus)(query, top_k, **options)
+
+    def search_many(self, query: str, corpora: Optional[List[str]] = None, top_k: int = 5) -> List[Dict]:
+        """
+        Fan a query out to several corpora in parallel and merge with reciprocal
+        rank fusion (scores of different corpora are not comparable). Each row
+        gets a "corpus" key.
+        """
+        names = corpora or self.corpora
+        backends = [self.backend(name) for name in names]
+        embed_query(query)  # memoized: every backend reuses this embedding
+        with ThreadPoolExecutor(max_workers=min(FANOUT_WORKERS, len(names)) or 1) as pool:
+            per_corpus = list(pool.map(lambda fn: fn(query, top_k), backends))
+
+        merged = []
+        for name, rows in zip(names, per_corpus):
+            for rank, row in enumerate(rows):
+                merged.append((1.0 / (RRF_K + rank + 1), {**row, "corpus": name}))
+        merged.sort(key=lambda x: x[0], reverse=True)
+        return [row for _, row in merged[:top_k]]
@@ -0,0 +1,166 @@
+import sys
+import json
+import asyncio
+from typing import List, Dict, Optional
+
+from fastmcp import FastMCP, Context
+
+from .corpora import get_engine
+
+# Limits applied to every tool call
+MAX_TOP_K = 20
+MAX_BATCH = 32
+DEFAULT_MAX_CHARS = 500
+MAX_ARTICLE = 10_000  # open upper end of an article-number range
+
+# Tools run the apps' own pipelines (see corpora.py): FAQ search with its cascade,
+# columnar corpus, result cache and tuned knobs; labor-law search with article
+# lookup, structural filters and result cache.
+
+mcp = FastMCP("Knowledge Search 🔎")
+
+
+# ---------- Payload trimming ----------
+def trim(text: str, max_chars: int) -> str:
+    text = text or ""
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+
+
+def trim_faq(row: Dict, max_chars: int) -> Dict:
+    return {
+        "doc_id": row["doc_id"],
+        "question": row["question"],
+        "answer": trim(row["answer"], max_chars),
+        "score": round(row["score"], 4),
+    }
+
+
+def trim_article(row: Dict, max_chars: int, include_english: bool) -> Dict:
+    meta = row["metadata"]
+    out = {
+        "article_number": meta.get("article_number"),
+        "article_name": meta.get("arabic_name", ""),
+        "part": meta.get("part_title_ar", ""),
+        "chapter": meta.get("chapter_title_ar", ""),
+        "score": round(row["score"], 4),
+        "content": trim(row["content"], max_chars),
+    }
+    if include_english:
+        out["english_content"] = trim(meta.get("english_content", ""), max_chars)
+    return out
+
+
+def clamp(top_k: Optional[int]) -> Optional[int]:
+    """None keeps the app's tuned default."""
+    return None if top_k is None else max(1, min(top_k, MAX_TOP_K))
+
+
+def article_filters(part: Optional[int], chapter: Optional[int], article_from: Optional[int],
+                    article_to: Optional[int], english_only: bool) -> Dict:
+    """Tool arguments -> labor-law backend options (see hr_assistant/article_filters.py)."""
+    article = None
+    if article_from is not None or article_to is not None:
+        article = (article_from or 0, article_to if article_to is not None else MAX_ARTICLE)
+    return {"part": part, "chapter": chapter, "article": article, "english": True if english_only else None}
+
+
+# ---------- Search helpers ----------
+async def _search(corpus: str, query: str, top_k: Optional[int], **options) -> List[Dict]:
+    # retrieval is CPU/IO bound and synchronous; keep the event loop free
+    return await asyncio.to_thread(get_engine().search, corpus, query, clamp(top_k), **options)
+
+
+async def _search_many(corpus: str, queries: List[str], top_k: Optional[int], shape, ctx: Context, **options) -> List[Dict]:
+    """Run queries one by one, streaming each query's results as a progress notification."""
+    queries = queries[:MAX_BATCH]
+    out = []
+    for i, q in enumerate(queries):
+        results = [shape(r) for r in await _search(corpus, q, top_k, **options)]
+        out.append({"query": q, "results": results})
+        if ctx is not None:
+            await ctx.report_progress(i + 1, len(queries), json.dumps(out[-1], ensure_ascii=False))
+    return out
+
+
+# ---------- Tools ----------
+@mcp.tool
+async def search_faq(query: str, top_k: Optional[int] = None, max_chars: int = DEFAULT_MAX_CHARS) -> List[Dict]:
+    """
+    Searches the customer-support FAQ (hybrid dense + BM25, cross-encoder reranked).
+
+    Parameters:
+        query (str): The customer's question.
+        top_k (int): Number of results (default and maximum: the app's FINAL_TOP_N).
+        max_chars (int): Answers longer than this are truncated.
+
+    Returns:
+        list[dict]: doc_id, question, answer and score per result.
+    """
+    return [trim_faq(r, max_chars) for r in await _search("faq", query, top_k)]
+
+
+@mcp.tool
+async def search_faq_many(queries: List[str], top_k: int = 3, max_chars: int = DEFAULT_MAX_CHARS, ctx: Context = None) -> List[Dict]:
+    """
+    Searches the customer-support FAQ for several questions in one call (max 32).
+    Each question's results are also streamed as a progress notification.
+
+    Returns:
+        list[dict]: One {query, results} entry per question.
+    """
+    return await _search_many("faq", queries, top_k, lambda r: trim_faq(r, max_chars), ctx)
+
+
+@mcp.tool
+async def search_labor_law(query: str, top_k: Optional[int] = None, max_chars: int = DEFAULT_MAX_CHARS,
+                           include_english: bool = False, part: Optional[int] = None, chapter: Optional[int] = None,
+                           article_from: Optional[int] = None, article_to: Optional[int] = None,
+                           english_only: bool = False) -> List[Dict]:
+    """
+    Searches the Saudi Labor Law articles (Arabic or English question).
+    Articles the question names ("المادة 77", "Article 77") are returned directly.
+
+    Parameters:
+        query (str): The question.
+        top_k (int): Number of articles (default: the app's tuned TOP_K, max 20).
+        max_chars (int): Article text longer than this is truncated.
+        include_english (bool): Also return the English translation.
+        part (int): Only articles of this part (الباب).
+        chapter (int): Only articles of this chapter (الفصل).
+        article_from, article_to (int): Inclusive article-number range; either end may be left open.
+        english_only (bool): Only articles that have an English translation.
+
+    Returns:
+        list[dict]: article number/name, part, chapter, score and content per result.
+    """
+    options = article_filters(part, chapter, article_from, article_to, english_only)
+    return [trim_article(r, max_chars, include_english) for r in await _search("labor_law", query, top_k, **options)]
+
+
+@mcp.tool
+async def search_labor_law_many(queries: List[str], top_k: int = 3, max_chars: int = DEFAULT_MAX_CHARS,
+                                include_english: bool = False, part: Optional[int] = None, chapter: Optional[int] = None,
+                                article_from: Optional[int] = None, article_to: Optional[int] = None,
+                                english_only: bool = False, ctx: Context = None) -> List[Dict]:
+    """
+    Searches the Saudi Labor Law for several questions in one call (max 32),
+    with the same filters as search_labor_law applied to every question.
+    Each question's results are also streamed as a progress notification.
+
+    Returns:
+        list[dict]: One {query, results} entry per question.
+    """
+    options = article_filters(part, chapter, article_from, article_to, english_only)
+    return await _search_many("labor_law", queries, top_k, lambda r: trim_article(r, max_chars, include_english), ctx, **options)
+
+
+if __name__ == "__main__":
+    # python -m rag_engine.mcp_server            -> stdio
+    # python -m rag_engine.mcp_server http 8001  -> streamable HTTP on /mcp
+    print("🔥 Loading the apps' search pipelines...", file=sys.stderr)
+    get_engine().warm_up()
+    if len(sys.argv) > 1 and sys.argv[1] == "http":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8001
+        mcp.run(transport="http", host="127.0.0.1", port=port)
+    else:
+        mcp.run()
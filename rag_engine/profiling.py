@@ -0,0 +1,228 @@
+import os
+import sys
+import json
+import time
+import uuid
+import pstats
+import cProfile
+import threading
+from io import StringIO
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# On-demand request profiling, shared by the apps.
+#   PROFILE_SLOW_MS=800  -> every request runs with a stack sampler; requests
+#                           slower than 800 ms keep their profile
+#   debug=True           -> always keep the profile, plus a full cProfile (pstats)
+# Profiles land in PROFILE_DIR as <id>.json (query, stage timings, trigger),
+# <id>.folded (collapsed stacks: flamegraph.pl / speedscope) and <id>.pstats.
+# With neither set, profile_request() and stage() only check one ContextVar.
+#
+# Cost of PROFILE_SLOW_MS: the sampler is one thread per request, started and
+# joined around it (about 0.1 ms), which walks the request thread's stack every
+# PROFILE_SAMPLE_MS while holding the GIL (a few percent of CPU-bound Python
+# time at 5 ms). Raise PROFILE_SAMPLE_MS to make it cheaper and coarser.
+
+PROFILE_SLOW_MS = float(os.environ["PROFILE_SLOW_MS"]) if os.getenv("PROFILE_SLOW_MS") else None
+# relative to the working directory: each app keeps its own when run from its folder
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_MS = float(os.getenv("PROFILE_SAMPLE_MS", "5"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))  # newest profiles kept on disk
+
+
+class _Profile:
+    __slots__ = ("query", "kind", "debug", "stages")
+
+    def __init__(self, query: str, kind: str, debug: bool):
+        self.query = query
+        self.kind = kind
+        self.debug = debug
+        self.stages: List[Dict] = []
+
+
+_current: ContextVar[Optional[_Profile]] = ContextVar("current_profile", default=None)
+# one cProfile at a time: Python allows a single active profiler (3.12+), and
+# overlapping debug requests would also profile each other's threads
+_cprofile_lock = threading.Lock()
+
+
+class stage:
+    """Time a pipeline stage of the request being profiled (no-op otherwise)."""
+    __slots__ = ("name", "_profile", "_t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._profile = _current.get()
+        if self._profile is not None:
+            self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._profile is not None:
+            self._profile.stages.append({"stage": self.name, "ms": round((time.perf_counter() - self._t0) * 1000, 2)})
+        return False
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's Python stack every `interval` seconds."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True, name="profile-sampler")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_fold(frame)] += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+@contextmanager
+def profile_request(query: str, kind: str = "search", debug: bool = False):
+    """
+    Profile one request (search / answer). Nested calls join the outer request,
+    so a request always produces a single profile. A debug request that overlaps
+    another one's cProfile keeps the sampled profile only (no .pstats).
+    """
+    if _current.get() is not None or (PROFILE_SLOW_MS is None and not debug):
+        yield
+        return
+
+    profile = _Profile(query, kind, debug)
+    token = _current.set(profile)
+    sampler = _Sampler(threading.get_ident(), PROFILE_SAMPLE_MS / 1000)
+    sampler.start()
+    cprof = _start_cprofile() if debug else None
+    started_at = time.time()
+    t0 = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = repr(e)
+        raise
+    finally:
+        total_ms = (time.perf_counter() - t0) * 1000
+        if cprof is not None:
+            cprof.disable()
+            _cprofile_lock.release()
+        samples = sampler.stop()
+        _current.reset(token)
+        if debug or (PROFILE_SLOW_MS is not None and total_ms >= PROFILE_SLOW_MS):
+            _write(profile, started_at, total_ms, samples, cprof, error)
+
+
+def _start_cprofile() -> Optional[cProfile.Profile]:
+    """A running cProfile, or None when another request (or tool) is profiling."""
+    if not _cprofile_lock.acquire(blocking=False):
+        return None
+    cprof = cProfile.Profile()
+    try:
+        cprof.enable()
+    except ValueError:  # another profiler is active (e.g. a debugger)
+        _cprofile_lock.release()
+        return None
+    return cprof
+
+
+def _write(profile: _Profile, started_at: float, total_ms: float, samples: Counter, cprof, error) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started_at)) + f"{int(started_at * 1000) % 1000:03d}"
+    pid = f"{stamp}-{profile.kind}-{uuid.uuid4().hex[:6]}"  # sorts by time
+    base = os.path.join(PROFILE_DIR, pid)
+    files = {}
+    if samples:
+        with open(base + ".folded", "w") as f:
+            f.writelines(f"{stack} {n}\n" for stack, n in samples.items())
+        files["flamegraph"] = base + ".folded"
+    if cprof is not None:
+        cprof.dump_stats(base + ".pstats")
+        files["pstats"] = base + ".pstats"
+    meta = {
+        "id": pid,
+        "query": profile.query,
+        "kind": profile.kind,
+        "trigger": "debug" if profile.debug else "slow",
+        "started_at": started_at,
+        "total_ms": round(total_ms, 2),
+        "stages": profile.stages,
+        "samples": sum(samples.values()),
+        "files": files,
+        "error": error,
+    }
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    _prune()
+
+
+def _prune() -> None:
+    metas = sorted(n for n in os.listdir(PROFILE_DIR) if n.endswith(".json"))
+    for name in metas[:-PROFILE_KEEP]:
+        stem = name[:-len(".json")]
+        for ext in (".json", ".folded", ".pstats"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, stem + ext))
+            except OSError:
+                pass
+
+
+# ---------- Reading profiles (admin view) ----------
+def recent_profiles(limit: int = 50) -> List[Dict]:
+    """Newest profile metadata first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    names = sorted((n for n in os.listdir(PROFILE_DIR) if n.endswith(".json")), reverse=True)[:limit]
+    out = []
+    for name in names:
+        try:
+            with open(os.path.join(PROFILE_DIR, name), encoding="utf-8") as f:
+                out.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def hot_functions(meta: Dict, n: int = 10) -> List[Dict]:
+    """Functions most often on top of the sampled stacks (self time)."""
+    path = meta.get("files", {}).get("flamegraph")
+    if not path or not os.path.exists(path):
+        return []
+    leaves: Counter = Counter()
+    total = 0
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            leaves[stack.rsplit(";", 1)[-1]] += int(count)
+            total += int(count)
+    return [{"function": fn, "samples": c, "share": round(c / total, 3)} for fn, c in leaves.most_common(n)]
+
+
+def pstats_summary(meta: Dict, n: int = 25) -> str:
+    """Top functions by cumulative time from the cProfile dump (debug requests)."""
+    path = meta.get("files", {}).get("pstats")
+    if not path or not os.path.exists(path):
+        return ""
+    out = StringIO()
+    pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(n)
+    return out.getvalue()
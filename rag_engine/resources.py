@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import List
+from qdrant_client import QdrantClient
+
+from .config import QDRANT_URL, QDRANT_PATH, EMBED_MODEL_NAME, RERANK_MODEL_NAME
+
+# Process-wide resources shared by every app loaded in the process: the models
+# are loaded once, on first use, whichever app (or the engine) asks first.
+
+
+def new_client() -> QdrantClient:
+    """A client of its own (forked workers must not share the parent's connections)."""
+    if QDRANT_PATH:
+        return QdrantClient(path=QDRANT_PATH)
+    return QdrantClient(url=QDRANT_URL)
+
+
+@lru_cache(maxsize=1)
+def get_client() -> QdrantClient:
+    """The process' Qdrant client. Local mode allows one client per storage
+    folder and process, so everything in the process has to go through this one."""
+    return new_client()
+
+
+@lru_cache(maxsize=1)
+def get_embed_model():
+    """The multilingual-e5 embedder used for every collection."""
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+    return HuggingFaceEmbedding(model_name=EMBED_MODEL_NAME)
+
+
+@lru_cache(maxsize=1024)
+def embed_query(query: str) -> List[float]:
+    """Query embedding, memoized: computed once for dense search and the semantic
+    caches, and once for a query fanned out to several apps."""
+    return get_embed_model().get_query_embedding(query)
+
+
+@lru_cache(maxsize=1)
+def get_cross_encoder():
+    """Cross-encoder scoring (query, text) pairs directly, so candidates can stay
+    (position, score) tuples instead of nodes."""
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(RERANK_MODEL_NAME, max_length=512)
@@ -0,0 +1,172 @@
+import os
+import re
+import copy
+import time
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Two-tier, versioned result cache (in process, shared by all sessions/threads
+# and by the apps loaded in the process; each app uses its own cache names).
+#   exact tier:    normalized query text -> result
+#   semantic tier: query embedding within CACHE_SEMANTIC_THRESHOLD (cosine) of a
+#                  cached query's embedding -> that query's result
+# Every cache is tied to a version string (index + corpus fingerprint); when it
+# changes, all entries are dropped. The version is re-read at most every
+# CACHE_VERSION_TTL seconds.
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))  # 0 disables the cache
+RESULT_CACHE = os.getenv("RESULT_CACHE", "true").lower() == "true" and CACHE_MAX_ENTRIES > 0
+
+
+def semantic_threshold(env_var: str, default: str) -> Optional[float]:
+    """Cosine similarity for a semantic hit, from `env_var`; empty disables the
+    semantic tier (exact matches only)."""
+    value = os.getenv(env_var, default)
+    return float(value) if value else None
+
+
+CACHE_SEMANTIC_THRESHOLD = semantic_threshold("CACHE_SEMANTIC_THRESHOLD", "0.95")
+CACHE_VERSION_TTL = float(os.getenv("CACHE_VERSION_TTL", "30"))
+
+_SPACES = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.,;:؟،؛]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Exact-tier key: NFKC, case-folded, whitespace collapsed, trailing punctuation dropped."""
+    text = unicodedata.normalize("NFKC", query or "").casefold()
+    return _TRAILING.sub("", _SPACES.sub(" ", text).strip())
+
+
+class ResultCache:
+    """
+    LRU cache with an exact and a semantic tier. Embeddings are kept as rows of
+    one preallocated matrix, so the semantic lookup is a single mat-vec product.
+    max_entries <= 0 gives a cache that stores nothing (every get is a miss).
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, threshold: Optional[float] = CACHE_SEMANTIC_THRESHOLD,
+                 version_ttl: float = CACHE_VERSION_TTL):
+        self.max_entries = max(max_entries, 0)
+        self.threshold = threshold
+        self.version_ttl = version_ttl
+        self.version: Optional[str] = None
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self._clear()
+
+    def _clear(self) -> None:
+        self._entries: "OrderedDict[str, Tuple[int, Any]]" = OrderedDict()  # key -> (slot, value), LRU order
+        self._slot_keys: list = [None] * self.max_entries
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        self._vectors: Optional[np.ndarray] = None  # allocated on the first vector (dim unknown before)
+        self._used = np.zeros(self.max_entries, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------- Versioning ----------
+    def sync(self, version_fn: Callable[[], str]) -> None:
+        """Drop every entry if the index/corpus version changed (checked every version_ttl s)."""
+        now = time.monotonic()
+        if now - self._checked_at < self.version_ttl:
+            return
+        version = version_fn()
+        with self._lock:
+            self._checked_at = now
+            if version != self.version:
+                if self.version is not None:
+                    self.stats["invalidations"] += 1
+                self._clear()
+                self.version = version
+
+    # ---------- Lookup / store ----------
+    def get(self, query: str, embed: Optional[Callable[[str], Sequence[float]]] = None) -> Tuple[Optional[Any], Optional[str]]:
+        """(result, "exact" | "semantic") on a hit, (None, None) on a miss.
+        `embed` is only called when the exact tier misses."""
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["exact"] += 1
+                return copy.deepcopy(entry[1]), "exact"
+            if self.threshold is None or embed is None or self._vectors is None or not self._entries:
+                self.stats["miss"] += 1
+                return None, None
+        vector = _unit(embed(query))
+        with self._lock:
+            if self._vectors is None or not self._entries:
+                self.stats["miss"] += 1
+                return None, None
+            sims = self._vectors @ vector
+            sims[~self._used] = -np.inf
+            slot = int(np.argmax(sims))
+            if sims[slot] < self.threshold:
+                self.stats["miss"] += 1
+                return None, None
+            hit_key = self._slot_keys[slot]
+            self._entries.move_to_end(hit_key)
+            self.stats["semantic"] += 1
+            return copy.deepcopy(self._entries[hit_key][1]), "semantic"
+
+    def put(self, query: str, value: Any, embed: Optional[Callable[[str], Sequence[float]]] = None) -> None:
+        key = normalize_query(query)
+        vector = _unit(embed(query)) if self.threshold is not None and embed is not None else None
+        if not self.max_entries:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if key in self._entries:
+                slot, _ = self._entries.pop(key)
+            else:
+                if not self._free:
+                    _, (old_slot, _) = self._entries.popitem(last=False)
+                    self._release(old_slot)
+                slot = self._free.pop()
+            self._entries[key] = (slot, value)
+            self._slot_keys[slot] = key
+            if vector is not None:
+                if self._vectors is None:
+                    self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+                self._vectors[slot] = vector
+                self._used[slot] = True
+            else:
+                self._used[slot] = False
+
+    def _release(self, slot: int) -> None:
+        self._used[slot] = False
+        self._slot_keys[slot] = None
+        self._free.append(slot)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    n = float(np.linalg.norm(v))
+    return v / n if n > 0 else v
+
+
+_caches: Dict[str, ResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, threshold: Optional[float] = CACHE_SEMANTIC_THRESHOLD) -> ResultCache:
+    """Process-wide cache per kind of result (e.g. "search", "answer:<model>");
+    `threshold` applies when the cache is first created."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = ResultCache(threshold=threshold)
+        return _caches[name]
+
+
+def cache_stats() -> Dict[str, Dict]:
+    return {name: {"entries": len(c), "version": c.version, **c.stats} for name, c in _caches.items()}
@@ -0,0 +1,32 @@
+import zlib
+from collections import Counter
+from typing import Dict, List
+from qdrant_client import models
+
+# BM25 sparse vectors for server-side lexical search (QDRANT_HYBRID=true).
+# Documents carry the BM25 term-frequency part; Qdrant applies the IDF part
+# itself (Modifier.IDF), so a query vector is just its token ids.
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def token_id(token: str) -> int:
+    """Stable sparse index for a token (same on every replica, no vocabulary file)."""
+    return zlib.crc32(token.encode("utf-8")) & 0x7FFFFFFF
+
+
+def bm25_doc_vector(tokens: List[str], avgdl: float, k1: float = BM25_K1, b: float = BM25_B) -> models.SparseVector:
+    """BM25 term-frequency part of a document; IDF is applied by Qdrant at query time."""
+    tf = Counter(tokens)
+    norm = k1 * (1 - b + b * len(tokens) / (avgdl or 1))  # avgdl is 0 when every text is empty
+    weights: Dict[int, float] = {}
+    for tok, n in tf.items():
+        idx = token_id(tok)
+        weights[idx] = weights.get(idx, 0.0) + n * (k1 + 1) / (n + norm)
+    return models.SparseVector(indices=list(weights.keys()), values=list(weights.values()))
+
+
+def bm25_query_vector(tokens: List[str]) -> models.SparseVector:
+    indices = sorted({token_id(t) for t in tokens})
+    return models.SparseVector(indices=indices, values=[1.0] * len(indices))
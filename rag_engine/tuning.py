@@ -0,0 +1,81 @@
+import os
+import json
+import logging
+import itertools
+from typing import Any, Dict, List, Optional
+
+# Retrieval knobs tuned per deployment, shared by the apps' autotune.py.
+# Each app keeps its own retrieval_config.json next to its modules (or at the
+# path of its own env var); modules read it at import through load_params(),
+# and the hand-picked defaults apply when the file is absent.
+#
+#   {"params": {"VEC_TOP_K": 12, ...}, "metrics": {...}, "tuned_at": "..."}
+
+CONFIG_FILE = "retrieval_config.json"
+LATENCY_COLUMNS = ("avg_latency_ms", "p95_latency_ms")
+
+logger = logging.getLogger(__name__)
+
+
+def config_path(app_dir: str, env_var: str) -> str:
+    """An app's config file: `env_var` if set, else retrieval_config.json in `app_dir`
+    (not the working directory, so the app reads the same file wherever it is started)."""
+    return os.getenv(env_var) or os.path.join(app_dir, CONFIG_FILE)
+
+
+def load_params(path: str, **defaults: Any) -> Dict[str, Any]:
+    """`defaults` overridden by the tuned "params" of the config file, if there is one."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            tuned = json.load(f).get("params", {})
+        params = {k: type(v)(tuned.get(k, v)) for k, v in defaults.items()}
+    except FileNotFoundError:
+        return defaults
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        logger.warning("ignoring retrieval config %s: %s", path, e)
+        return defaults
+    unknown = set(tuned) - set(defaults)
+    if unknown:
+        logger.warning("ignoring unknown retrieval params in %s: %s", path, sorted(unknown))
+    return params
+
+
+def save_params(params: Dict[str, Any], path: str, **info: Any) -> None:
+    """Write the chosen params (plus how they were chosen) atomically."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"params": params, **info}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def configurations(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the grid, as {knob: value} dicts."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def pareto_front(results, quality: str, latency: str):
+    """Configurations (DataFrame rows) no other one beats on both quality (higher)
+    and latency (lower), fastest first."""
+    ordered = results.sort_values([latency, quality], ascending=[True, False])
+    keep, best = [], float("-inf")
+    for i, q in ordered[quality].items():
+        if q > best:
+            keep.append(i)
+            best = q
+    return ordered.loc[keep]
+
+
+def choose(front, quality: str, latency: str, max_latency_ms: Optional[float] = None, tolerance: float = 0.01):
+    """
+    Fastest frontier configuration within `tolerance` of the best quality,
+    among those under `max_latency_ms` (the fastest overall if none is).
+    """
+    if max_latency_ms is not None:
+        within = front[front[latency] <= max_latency_ms]
+        if within.empty:
+            logger.warning("no configuration under %s ms, taking the fastest", max_latency_ms)
+            return front.iloc[0]
+        front = within
+    good = front[front[quality] >= front[quality].max() - tolerance]
+    return good.iloc[0]
@@ -0,0 +1,36 @@
+import json
+import hashlib
+from typing import Dict, Iterable, Optional
+from qdrant_client import QdrantClient
+
+from .config import EMBED_MODEL_NAME
+
+# Content hash of an ingested collection, for the result caches' index_version.
+# It is computed once at ingest over the point payloads (and the embedding
+# model) and stored in the collection metadata, so serving only reads it back:
+# an in-place re-ingest with the same point count still changes the version.
+
+CONTENT_HASH_KEY = "content_hash"
+
+
+def content_hash(payloads: Iterable[Dict]) -> str:
+    """sha256 over the payloads in point order, plus the embedding model name."""
+    h = hashlib.sha256(EMBED_MODEL_NAME.encode("utf-8"))
+    for payload in payloads:
+        h.update(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def store_content_hash(client: QdrantClient, collection: str, digest: str) -> None:
+    """Record the hash once every point is upserted (a half-done ingest keeps none)."""
+    client.update_collection(collection_name=collection, metadata={CONTENT_HASH_KEY: digest})
+
+
+def collection_version(client: QdrantClient, collection: str) -> str:
+    """The stored content hash; collections ingested before hashes were stored
+    fall back to their point count."""
+    metadata: Optional[Dict] = client.get_collection(collection).config.metadata
+    if metadata and metadata.get(CONTENT_HASH_KEY):
+        return metadata[CONTENT_HASH_KEY]
+    return f"points={client.count(collection_name=collection, exact=True).count}"
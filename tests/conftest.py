@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the tests import the repo-level rag_engine package; app modules are loaded
+# with rag_engine.apps.load_app, as the engine does
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from rag_engine.apps import load_app
+
+article_filters, article_store = load_app("hr_assistant", "article_filters", "article_store")
+ArticleFilter = article_filters.ArticleFilter
+
+ARTICLES = [
+    {"index": 1, "part_number": 1, "chapter_number": 1, "article_number": 11, "number_ar": "الحادية عشرة",
+     "arabic_content": "نص", "english_content": "text"},
+    {"index": 2, "part_number": 1, "chapter_number": 1, "article_number": 11, "number_ar": "الحادية عشرة مكرر",
+     "arabic_content": "نص", "english_content": None},
+    {"index": 3, "part_number": 5, "chapter_number": 2, "article_number": 77, "number_ar": "السابعة والسبعون",
+     "arabic_content": "نص", "english_content": "text"},
+    {"index": 4, "part_number": 5, "chapter_number": 2, "article_number": 79, "number_ar": "التاسعة والسبعون مكرر",
+     "arabic_content": "نص", "english_content": ""},
+]
+
+
+@pytest.fixture(scope="module")
+def names():
+    names, _ = article_filters.reference_table((a["index"] - 1, a["article_number"], a["number_ar"]) for a in ARTICLES)
+    return names
+
+
+def test_reference_table_positions():
+    _, positions = article_filters.reference_table((a["index"] - 1, a["article_number"], a["number_ar"]) for a in ARTICLES)
+    assert positions == {(11, False): [0], (11, True): [1], (77, False): [2], (79, True): [3]}
+
+
+@pytest.mark.parametrize("query, refs", [
+    ("ما نص المادة 77؟", [(77, False)]),
+    ("المادة (٧٧)", [(77, False)]),
+    ("المادة 11 مكرر", [(11, True)]),
+    ("Article 12 and article 79 bis", [(12, False), (79, True)]),
+    ("ما هي المادة السابعة والسبعون", [(77, False)]),
+    ("المادة التاسعة والسبعون مكرر ثم المادة 77", [(79, True), (77, False)]),
+    ("المادة 77 و المادة 77", [(77, False)]),
+    ("annual leave", []),
+])
+def test_find_article_refs(names, query, refs):
+    assert article_filters.find_article_refs(query, names) == refs
+
+
+def test_filter_fields():
+    f = ArticleFilter(part=5, article=(70, 80))
+    assert f.key() == ((5, 5), None, (70, 80), None)
+    assert list(f.ranges()) == [("part_number", (5, 5)), ("article_number", (70, 80))]
+    assert f and not ArticleFilter()
+    assert ArticleFilter().to_qdrant() is None
+
+
+def test_filter_to_qdrant():
+    must = ArticleFilter(chapter=2, english=True).to_qdrant().must
+    assert [c.key for c in must] == ["chapter_number", article_filters.ENGLISH_FLAG]
+    assert (must[0].range.gte, must[0].range.lte) == (2, 2)
+    assert must[1].match.value is True
+
+
+def test_facet_mask():
+    facets = article_store.ArticleStore.from_articles(ARTICLES).facets
+    mask = lambda f: facets.mask(f.ranges(), f.english)
+    np.testing.assert_array_equal(mask(ArticleFilter(part=5)), [False, False, True, True])
+    np.testing.assert_array_equal(mask(ArticleFilter(article=(11, 77))), [True, True, True, False])
+    np.testing.assert_array_equal(mask(ArticleFilter(english=True)), [True, False, True, False])
+    np.testing.assert_array_equal(mask(ArticleFilter(part=1, english=False)), [False, True, False, False])
+    assert not mask(ArticleFilter(part=9)).any()
@@ -0,0 +1,51 @@
+import pytest
+
+from rag_engine.apps import load_app
+
+cascade, = load_app("customer-support", "cascade")
+
+THRESHOLDS = {"dense_margin_min": 0.03, "bm25_margin_min": 0.25, "dense_only_margin": 0.12}
+
+
+def test_margin():
+    assert cascade.margin([]) == 0.0
+    assert cascade.margin([("a", 0.9)]) == pytest.approx(0.9)
+    assert cascade.margin([("a", 0.9), ("b", 0.8)]) == pytest.approx(0.1)
+    assert cascade.margin([("a", 10.0), ("b", 6.0)], relative=True) == pytest.approx(0.4)
+    assert cascade.margin([("a", 0.0), ("b", 0.0)], relative=True) == 0.0
+
+
+def test_dense_margin_exit():
+    v = [(1, 0.95), (2, 0.80)]
+    assert cascade.cascade_exit(v, [(3, 5.0)], **THRESHOLDS) == "dense_margin"
+
+
+def test_dense_only_exit_disabled_by_zero():
+    v = [(1, 0.95), (2, 0.80)]
+    assert cascade.cascade_exit(v, [(3, 5.0)], **{**THRESHOLDS, "dense_only_margin": 0}) is None
+
+
+def test_agreement_exit_needs_the_same_top1_and_both_margins():
+    v = [(1, 0.90), (2, 0.85)]
+    assert cascade.cascade_exit(v, [(1, 10.0), (2, 6.0)], **THRESHOLDS) == "agreement"
+    assert cascade.cascade_exit(v, [(2, 10.0), (1, 6.0)], **THRESHOLDS) is None  # different top-1
+    assert cascade.cascade_exit(v, [(1, 10.0), (2, 9.0)], **THRESHOLDS) is None  # bm25 margin too small
+    assert cascade.cascade_exit([(1, 0.90), (2, 0.89)], [(1, 10.0), (2, 6.0)], **THRESHOLDS) is None
+
+
+def test_no_dense_hits_reranks():
+    assert cascade.cascade_exit([], [(1, 10.0)], **THRESHOLDS) is None
+
+
+def test_adaptive_depth():
+    scored = [(i, s) for i, s in enumerate([0.90, 0.88, 0.85, 0.70, 0.60])]
+    assert len(cascade.adaptive_depth(scored, window=0.08)) == 3
+    assert len(cascade.adaptive_depth(scored, window=0.01)) == cascade.CASCADE_MIN_DEPTH
+    assert len(cascade.adaptive_depth(scored, floor=0.7)) == 4  # 0.60 < 0.7 * 0.90
+    assert cascade.adaptive_depth([], window=0.1) == []
+
+
+def test_rrf_merge_rewards_agreement():
+    fused = cascade.rrf_merge([("a", 1.0), ("b", 0.5)], [("b", 9.0), ("c", 1.0)])
+    assert [k for k, _ in fused] == ["b", "a", "c"]
+    assert fused[0][1] == pytest.approx(1 / (cascade.RRF_K + 2) + 1 / (cascade.RRF_K + 1))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from rag_engine.columns import BM25Columns, TextColumn, file_sha256
+
+CORPUS = [
+    "how do i reset my password",
+    "how do i create an account",
+    "password reset link expired",
+    "shipping takes five days",
+    "",
+    "reset reset reset",
+]
+TOKENIZED = [t.split() for t in CORPUS]
+QUERIES = [["reset", "password"], ["account"], ["shipping", "days", "unknown"], ["unknown"], []]
+
+
+def test_text_column_round_trip():
+    strings = ["", "abc", "المادة 77", "é"]
+    column = TextColumn.from_strings(strings)
+    assert len(column) == len(strings)
+    assert [column[i] for i in range(len(column))] == strings
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_bm25_columns_match_bm25okapi(query):
+    rank_bm25 = pytest.importorskip("rank_bm25")
+    expected = rank_bm25.BM25Okapi(TOKENIZED).get_scores(query)
+    np.testing.assert_allclose(BM25Columns.build(TOKENIZED).get_scores(query), expected)
+
+
+def test_mask_skips_documents_outside_it():
+    bm25 = BM25Columns.build(TOKENIZED)
+    mask = np.array([False, True, True, True, True, False])
+    full = bm25.get_scores(["reset", "password"])
+    masked = bm25.get_scores(["reset", "password"], mask)
+    np.testing.assert_allclose(masked[mask], full[mask])
+    assert not masked[~mask].any()
+
+
+def test_top_k_is_best_first_and_stable_on_ties():
+    bm25 = BM25Columns.build(TOKENIZED)
+    top = bm25.top_k(["password"], 3)
+    assert [p for p, _ in top] == [2, 0, 1]  # shorter document first, then the zero scores in corpus order
+    assert top[0][1] > top[1][1] > top[2][1] == 0
+    # no match at all: corpus order
+    assert [p for p, _ in bm25.top_k(["unknown"], 3)] == [0, 1, 2]
+
+
+def test_file_sha256(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"id,question\n0,hi\n")
+    first = file_sha256(str(path))
+    assert first == file_sha256(str(path))
+    path.write_bytes(b"id,question\n0,hello\n")
+    assert file_sha256(str(path)) != first
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+pytest.importorskip("fitz")
+from rag_engine.apps import load_app
+
+labor_pdf_pipeline, = load_app("hr_assistant", "labor_pdf_pipeline")
+
+
+def write(path, articles):
+    path.write_text(json.dumps(articles, ensure_ascii=False), encoding="utf-8")
+
+
+def test_has_translations(tmp_path):
+    path = tmp_path / "parsed.json"
+    assert not labor_pdf_pipeline.has_translations(str(path))
+    write(path, [{"arabic_content": "نص", "english_content": ""}])
+    assert not labor_pdf_pipeline.has_translations(str(path))
+    write(path, [{"arabic_content": "نص", "english_content": "text"}])
+    assert labor_pdf_pipeline.has_translations(str(path))
+
+
+def test_cli_refuses_to_overwrite_translations(tmp_path):
+    path = tmp_path / "parsed.json"
+    write(path, [{"arabic_content": "نص", "english_content": "text"}])
+    with pytest.raises(SystemExit):
+        labor_pdf_pipeline.main([str(tmp_path / "missing.pdf"), "-o", str(path)])
+    assert labor_pdf_pipeline.has_translations(str(path))
+
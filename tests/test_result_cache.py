@@ -0,0 +1,114 @@
+from rag_engine.result_cache import ResultCache, normalize_query, semantic_threshold
+
+VECTORS = {
+    "annual leave": [1.0, 0.0, 0.0],
+    "yearly leave": [0.99, 0.1, 0.0],
+    "salary": [0.0, 1.0, 0.0],
+    "overtime": [0.0, 0.0, 1.0],
+}
+
+
+def embed(query):
+    return VECTORS[query]
+
+
+def test_normalize_query():
+    assert normalize_query("  Annual   LEAVE?? ") == "annual leave"
+    assert normalize_query("ما هي الإجازة؟") == "ما هي الإجازة"
+
+
+def test_exact_hit_and_copies():
+    cache = ResultCache(max_entries=4, threshold=None)
+    value = [{"doc_id": "faq-0001"}]
+    cache.put("Annual leave", value)
+    value[0]["doc_id"] = "changed"
+    hit, tier = cache.get("annual leave?")
+    assert (hit, tier) == ([{"doc_id": "faq-0001"}], "exact")
+    hit[0]["doc_id"] = "changed"
+    assert cache.get("annual leave")[0] == [{"doc_id": "faq-0001"}]
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2, threshold=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") == (None, None)
+    assert cache.get("a") == (1, "exact")
+    assert cache.get("c") == (3, "exact")
+
+
+def test_semantic_hit_within_threshold():
+    cache = ResultCache(max_entries=4, threshold=0.95)
+    cache.put("annual leave", "A", embed)
+    cache.put("salary", "S", embed)
+    assert cache.get("yearly leave", embed) == ("A", "semantic")
+    assert cache.get("overtime", embed) == (None, None)
+    assert cache.get("yearly leave") == (None, None)  # no embedder: exact tier only
+
+
+def test_evicted_entries_leave_the_semantic_tier():
+    cache = ResultCache(max_entries=1, threshold=0.95)
+    cache.put("annual leave", "A", embed)
+    cache.put("salary", "S", embed)
+    assert cache.get("yearly leave", embed) == (None, None)
+
+
+def test_version_change_drops_entries():
+    cache = ResultCache(max_entries=4, threshold=None, version_ttl=0)
+    cache.sync(lambda: "v1")
+    cache.put("a", 1)
+    cache.sync(lambda: "v1")
+    assert cache.get("a") == (1, "exact")
+    cache.sync(lambda: "v2")
+    assert cache.get("a") == (None, None)
+    assert cache.version == "v2"
+    assert cache.stats["invalidations"] == 1
+
+
+def test_version_is_rechecked_after_ttl_only():
+    cache = ResultCache(max_entries=4, threshold=None, version_ttl=3600)
+    calls = []
+    cache.sync(lambda: calls.append(1) or "v1")
+    cache.sync(lambda: calls.append(1) or "v2")
+    assert len(calls) == 1 and cache.version == "v1"
+
+
+def test_zero_entries_stores_nothing():
+    cache = ResultCache(max_entries=0, threshold=0.95)
+    cache.put("annual leave", "A", embed)
+    assert len(cache) == 0
+    assert cache.get("annual leave", embed) == (None, None)
+
+
+# two different FAQ entries (data.csv ids 24 and 83) with the high baseline
+# cosine e5 gives short questions (~0.96 here)
+FAQ_VECTORS = {
+    "What is your email newsletter about?": [1.0, 0.2, 0.0],
+    "How do I unsubscribe from your newsletter?": [1.0, 0.0, 0.2],
+}
+
+
+def test_semantic_threshold_from_env(monkeypatch):
+    monkeypatch.delenv("FAQ_CACHE_SEMANTIC_THRESHOLD", raising=False)
+    assert semantic_threshold("FAQ_CACHE_SEMANTIC_THRESHOLD", "") is None
+    monkeypatch.setenv("FAQ_CACHE_SEMANTIC_THRESHOLD", "0.98")
+    assert semantic_threshold("FAQ_CACHE_SEMANTIC_THRESHOLD", "") == 0.98
+
+
+def test_distinct_faq_questions_do_not_collide(monkeypatch):
+    monkeypatch.delenv("FAQ_CACHE_SEMANTIC_THRESHOLD", raising=False)
+    first, second = FAQ_VECTORS
+    faq_embed = FAQ_VECTORS.__getitem__
+
+    # the FAQ default: exact tier only
+    cache = ResultCache(max_entries=4, threshold=semantic_threshold("FAQ_CACHE_SEMANTIC_THRESHOLD", ""))
+    cache.put(first, [{"doc_id": "faq-0024"}], faq_embed)
+    assert cache.get(second, faq_embed) == (None, None)
+
+    # what a 0.95 semantic tier would have served instead
+    cache = ResultCache(max_entries=4, threshold=0.95)
+    cache.put(first, [{"doc_id": "faq-0024"}], faq_embed)
+    assert cache.get(second, faq_embed) == ([{"doc_id": "faq-0024"}], "semantic")
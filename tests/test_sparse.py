@@ -0,0 +1,31 @@
+import pytest
+
+from rag_engine.sparse import BM25_B, BM25_K1, bm25_doc_vector, bm25_query_vector, token_id
+
+
+def test_token_id_is_stable_and_non_negative():
+    assert token_id("leave") == token_id("leave")
+    assert token_id("leave") != token_id("salary")
+    assert 0 <= token_id("إجازة") < 2 ** 31
+
+
+def test_doc_vector_is_the_bm25_tf_part():
+    tokens = ["annual", "leave", "leave"]
+    vec = bm25_doc_vector(tokens, avgdl=3.0)
+    weights = dict(zip(vec.indices, vec.values))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / 3.0)
+    assert weights[token_id("leave")] == pytest.approx(2 * (BM25_K1 + 1) / (2 + norm))
+    assert weights[token_id("annual")] == pytest.approx((BM25_K1 + 1) / (1 + norm))
+
+
+def test_doc_vector_with_zero_avgdl():
+    # every text of the corpus empty: avgdl is 0
+    assert bm25_doc_vector([], avgdl=0.0).indices == []
+    vec = bm25_doc_vector(["x"], avgdl=0.0)
+    assert len(vec.values) == 1 and vec.values[0] > 0
+
+
+def test_query_vector_has_unit_weights_and_unique_ids():
+    vec = bm25_query_vector(["leave", "annual", "leave"])
+    assert vec.indices == sorted({token_id("leave"), token_id("annual")})
+    assert vec.values == [1.0, 1.0]
@@ -0,0 +1,65 @@
+import json
+
+import pandas as pd
+import pytest
+
+from rag_engine.tuning import choose, config_path, configurations, load_params, pareto_front, save_params
+
+
+def test_config_path_defaults_to_the_app_dir(monkeypatch, tmp_path):
+    monkeypatch.delenv("TEST_RETRIEVAL_CONFIG", raising=False)
+    assert config_path(str(tmp_path), "TEST_RETRIEVAL_CONFIG") == str(tmp_path / "retrieval_config.json")
+    monkeypatch.setenv("TEST_RETRIEVAL_CONFIG", "/elsewhere.json")
+    assert config_path(str(tmp_path), "TEST_RETRIEVAL_CONFIG") == "/elsewhere.json"
+
+
+def test_missing_file_gives_the_defaults(tmp_path):
+    assert load_params(str(tmp_path / "none.json"), TOP_K=5, ALPHA=0.6) == {"TOP_K": 5, "ALPHA": 0.6}
+
+
+def test_tuned_values_override_and_keep_the_default_types(tmp_path):
+    path = tmp_path / "retrieval_config.json"
+    path.write_text(json.dumps({"params": {"TOP_K": 8.0, "ALPHA": 1, "OTHER": 3}}))
+    params = load_params(str(path), TOP_K=5, ALPHA=0.6, DENSE_TOP_K=3)
+    assert params == {"TOP_K": 8, "ALPHA": 1.0, "DENSE_TOP_K": 3}
+    assert isinstance(params["TOP_K"], int) and isinstance(params["ALPHA"], float)
+
+
+@pytest.mark.parametrize("content", ["{not json", json.dumps([1, 2]), json.dumps({"params": {"TOP_K": "many"}})])
+def test_unreadable_file_gives_the_defaults(tmp_path, content):
+    path = tmp_path / "retrieval_config.json"
+    path.write_text(content)
+    assert load_params(str(path), TOP_K=5) == {"TOP_K": 5}
+
+
+def test_save_then_load(tmp_path):
+    path = str(tmp_path / "retrieval_config.json")
+    save_params({"TOP_K": 3}, path, metrics={"mrr": 0.5})
+    assert load_params(path, TOP_K=5) == {"TOP_K": 3}
+    assert json.load(open(path))["metrics"] == {"mrr": 0.5}
+
+
+def test_configurations():
+    configs = configurations({"A": [1, 2], "B": [0.5]})
+    assert configs == [{"A": 1, "B": 0.5}, {"A": 2, "B": 0.5}]
+
+
+RESULTS = pd.DataFrame([
+    {"name": "slow-best", "mrr": 0.80, "p95": 100.0},
+    {"name": "fast-good", "mrr": 0.795, "p95": 40.0},
+    {"name": "fastest", "mrr": 0.60, "p95": 10.0},
+    {"name": "dominated", "mrr": 0.70, "p95": 50.0},
+])
+
+
+def test_pareto_front_is_fastest_first_without_dominated():
+    front = pareto_front(RESULTS, "mrr", "p95")
+    assert list(front["name"]) == ["fastest", "fast-good", "slow-best"]
+
+
+def test_choose_trades_tolerance_for_latency():
+    front = pareto_front(RESULTS, "mrr", "p95")
+    assert choose(front, "mrr", "p95")["name"] == "fast-good"
+    assert choose(front, "mrr", "p95", tolerance=0.0)["name"] == "slow-best"
+    assert choose(front, "mrr", "p95", max_latency_ms=20)["name"] == "fastest"
+    assert choose(front, "mrr", "p95", max_latency_ms=5)["name"] == "fastest"  # none under budget